@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+# Admission control for /generate_ppt
+#
+# Per-client token buckets and the global in-flight cost live in a small SQLite
+# file so every gunicorn worker on the host sees the same counters.
+ADMISSION_ENABLED = os.getenv('PPT_ADMISSION_ENABLED', '1') == '1'
+ADMISSION_DB = os.getenv('PPT_ADMISSION_DB', os.path.join(tempfile.gettempdir(), 'pptgen_admission.db'))
+
+RATE_PER_MINUTE = float(os.getenv('PPT_RATE_PER_MINUTE', 30))  # requests refilled per minute per client
+RATE_BURST = float(os.getenv('PPT_RATE_BURST', 10))            # bucket capacity per client
+MAX_INFLIGHT_COST = float(os.getenv('PPT_MAX_INFLIGHT_COST', 2000))
+TICKET_TTL = float(os.getenv('PPT_ADMISSION_TTL', 300))        # seconds before a leaked ticket expires
+BUSY_RETRY_AFTER = int(os.getenv('PPT_BUSY_RETRY_AFTER', 5))   # Retry-After sent with 503 responses
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 means
+# clients connect directly and the header is ignored
+TRUSTED_PROXIES = int(os.getenv('PPT_TRUSTED_PROXIES', 0))
+
+# Estimated render cost weights (1 unit ~ one simple content slide)
+COST_BASE = 1.0
+COST_PER_SLIDE = 1.0
+COST_PER_BLOCK = {'table': 0.5, 'chart': 2.0, 'images': 0.2, 'text_box': 0.1}
+COST_PER_TABLE_CELL = 0.04
+COST_PER_LIST_ITEM = 0.02
+COST_PER_IMAGE = 2.0
+COST_PER_IMAGE_MB = 4.0
+COST_PER_CHART_POINT = 0.0005
+
+# Render seconds per cost unit, used to log the actual cost of a request in
+# the same units as the estimate (tune with `flask --app main cost-report`)
+COST_UNIT_SECONDS = float(os.getenv('PPT_COST_UNIT_SECONDS', 0.0075))
+
+# Scheduling lanes: decks estimated at HEAVY_COST or more go to the heavy lane,
+# which at most HEAVY_SLOTS jobs on the host may occupy at once. Heavy jobs
+# render on the background pool in jobs.py, so request workers stay free for
+# small decks. MAX_INFLIGHT_COST only counts fast lane requests.
+HEAVY_COST = float(os.getenv('PPT_HEAVY_COST', 150))
+HEAVY_SLOTS = int(os.getenv('PPT_HEAVY_SLOTS', 1))
+FAST_LANE = 'fast'
+HEAVY_LANE = 'heavy'
+
+_initialized = False
+
+
+class Ticket:
+    """Result of an admission decision"""
+
+    def __init__(self, admitted, cost, status=200, retry_after=0, reason='', ticket_id=None, lane=FAST_LANE):
+        self.admitted = admitted
+        self.cost = cost
+        self.lane = lane
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+        self.ticket_id = ticket_id
+
+
+def _connect():
+    """Open a connection to the shared counters database"""
+    global _initialized
+    conn = sqlite3.connect(ADMISSION_DB, timeout=5, isolation_level=None)
+    if not _initialized:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS buckets (client TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS inflight (id TEXT PRIMARY KEY, cost REAL, started REAL, '
+                     "lane TEXT DEFAULT 'fast')")
+        if 'lane' not in {row[1] for row in conn.execute('PRAGMA table_info(inflight)')}:
+            conn.execute("ALTER TABLE inflight ADD COLUMN lane TEXT DEFAULT 'fast'")
+        _initialized = True
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def client_key(forwarded_for, remote_addr):
+    """Identify a client by the address our trusted proxies saw, or the socket address
+
+    Hops left of the ones added by our own proxies are sent by the client and
+    can be anything, so only the hop appended by the outermost trusted proxy
+    is used.
+    """
+    if TRUSTED_PROXIES and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if len(hops) >= TRUSTED_PROXIES:
+            return hops[-TRUSTED_PROXIES]
+    return remote_addr or 'unknown'
+
+
+def estimate_cost(content):
+    """Estimate the render cost of a deck from its JSON content"""
+    cost = COST_BASE
+    for slide in content.get('slides', []):
+        cost += COST_PER_SLIDE
+        for block in slide.get('blocks', []):
+            kind = block.get('kind', '')
+            cost += COST_PER_BLOCK.get(kind, 0)
+            if kind == 'table':
+                cost += COST_PER_TABLE_CELL * sum(len(row) for row in block.get('rows', []))
+            elif kind in ('bullets', 'numbered_list'):
+                cost += COST_PER_LIST_ITEM * len(block.get('items', []))
+            elif kind == 'images':
+                for img in block.get('items', []):
+                    cost += COST_PER_IMAGE
+                    path = img.get('path', '') if isinstance(img, dict) else ''
+                    if path and os.path.isfile(path):
+                        cost += COST_PER_IMAGE_MB * os.path.getsize(path) / (1024 * 1024)
+            elif kind == 'chart':
+                for series in block.get('series', []):
+                    points = series.get('values') or series.get('x') or series.get('points') or []
+                    cost += COST_PER_CHART_POINT * len(points)
+    return round(cost, 2)
+
+
+def lane_for(cost):
+    """Scheduling lane for a request of estimated `cost`"""
+    return HEAVY_LANE if cost >= HEAVY_COST else FAST_LANE
+
+
+def actual_cost(render_seconds):
+    """Measured render time converted to cost units"""
+    return round(render_seconds / COST_UNIT_SECONDS, 2)
+
+
+def _bucket_tokens(conn, client, now):
+    """Tokens in the client's bucket after refilling for the time since its last request"""
+    row = conn.execute('SELECT tokens, updated FROM buckets WHERE client = ?', (client,)).fetchone()
+    return RATE_BURST if row is None else min(RATE_BURST, row[0] + (now - row[1]) * RATE_PER_MINUTE / 60.0)
+
+
+def _set_bucket(conn, client, tokens, now):
+    conn.execute('INSERT OR REPLACE INTO buckets (client, tokens, updated) VALUES (?, ?, ?)',
+                 (client, tokens, now))
+
+
+def _refill_wait(tokens):
+    """Seconds until a bucket holding `tokens` has one whole token again"""
+    refill = RATE_PER_MINUTE / 60.0
+    return max(1, int((1 - tokens) / refill + 0.999)) if refill > 0 else 60
+
+
+def charge(client):
+    """Take one token from the client's bucket without reserving render capacity
+
+    For endpoints that only need the per-client rate limit. Returns a Ticket
+    that is either admitted or a 429 with Retry-After.
+    """
+    if not ADMISSION_ENABLED:
+        return Ticket(True, 0)
+    now = time.time()
+    conn = None
+    try:
+        conn = _connect()
+        conn.execute('BEGIN IMMEDIATE')
+        tokens = _bucket_tokens(conn, client, now)
+        if tokens < 1:
+            conn.execute('COMMIT')
+            return Ticket(False, 0, 429, _refill_wait(tokens), 'Too many requests from this client')
+        _set_bucket(conn, client, tokens - 1, now)
+        conn.execute('COMMIT')
+        return Ticket(True, 0)
+    except sqlite3.Error as e:
+        print(f"Warning: admission control unavailable: {e}")
+        return Ticket(True, 0)
+    finally:
+        if conn:
+            conn.close()
+
+
+def admit(client, cost):
+    """Charge the client's token bucket and reserve capacity in the request's lane
+
+    Returns a Ticket; rejected tickets carry a 429 (client over its rate) or
+    503 (lane at capacity) status and a Retry-After hint in seconds.
+    """
+    lane = lane_for(cost)
+    if not ADMISSION_ENABLED:
+        return Ticket(True, cost, lane=lane)
+
+    now = time.time()
+    conn = None
+    try:
+        conn = _connect()
+        conn.execute('BEGIN IMMEDIATE')
+
+        tokens = _bucket_tokens(conn, client, now)
+        if tokens < 1:
+            conn.execute('COMMIT')
+            return Ticket(False, cost, 429, _refill_wait(tokens), 'Too many requests from this client', lane=lane)
+
+        conn.execute('DELETE FROM inflight WHERE started < ?', (now - TICKET_TTL,))
+        if lane == HEAVY_LANE:
+            running = conn.execute('SELECT cost, started FROM inflight WHERE lane = ?', (HEAVY_LANE,)).fetchall()
+            if len(running) >= HEAVY_SLOTS:
+                conn.execute('COMMIT')
+                # The slot frees up when the heavy job closest to done finishes
+                remaining = min(c * COST_UNIT_SECONDS - (now - started) for c, started in running)
+                retry_after = max(BUSY_RETRY_AFTER, int(remaining + 0.999))
+                return Ticket(False, cost, 503, retry_after, 'Server is busy with large decks', lane=lane)
+        else:
+            inflight = conn.execute('SELECT COALESCE(SUM(cost), 0), COUNT(*) FROM inflight WHERE lane = ?',
+                                    (FAST_LANE,)).fetchone()
+            if inflight[1] and inflight[0] + cost > MAX_INFLIGHT_COST:
+                conn.execute('COMMIT')
+                return Ticket(False, cost, 503, BUSY_RETRY_AFTER, 'Server is busy', lane=lane)
+
+        ticket_id = uuid.uuid4().hex
+        _set_bucket(conn, client, tokens - 1, now)
+        conn.execute('INSERT INTO inflight (id, cost, started, lane) VALUES (?, ?, ?, ?)',
+                     (ticket_id, cost, now, lane))
+        conn.execute('COMMIT')
+        return Ticket(True, cost, ticket_id=ticket_id, lane=lane)
+    except sqlite3.Error as e:
+        # Never block generation because the counters store is unavailable
+        print(f"Warning: admission control unavailable: {e}")
+        return Ticket(True, cost, lane=lane)
+    finally:
+        if conn:
+            conn.close()
+
+
+def release(ticket):
+    """Return the ticket's reserved capacity"""
+    if not ticket or not ticket.ticket_id:
+        return
+    conn = None
+    try:
+        conn = _connect()
+        conn.execute('DELETE FROM inflight WHERE id = ?', (ticket.ticket_id,))
+    except sqlite3.Error as e:
+        print(f"Warning: could not release admission ticket: {e}")
+    finally:
+        if conn:
+            conn.close()
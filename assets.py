@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip variants are produced
+    brotli = None
+
+# Static asset pipeline: content-fingerprinted URLs, precompressed variants
+# built once per file version, and immutable caching
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Only text-like formats are worth compressing; images and media already are
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml', 'image/svg+xml')
+MIN_COMPRESS_BYTES = 512
+
+# Files above this size are not held in memory and are served from disk as is
+MAX_MEMORY_ASSET = int(os.getenv('PPT_ASSET_MEMORY_MB', 8)) * 1024 * 1024
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def fingerprinted_name(name, digest):
+    """'css/site.css' -> 'css/site.<digest>.css'"""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def compress_variants(data, mimetype):
+    """Precompressed bodies keyed by Content-Encoding, kept only when smaller"""
+    if len(data) < MIN_COMPRESS_BYTES or not (mimetype or '').startswith(COMPRESSIBLE_TYPES):
+        return {}
+    variants = {'gzip': gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+
+# File suffix of each precompressed variant written by build_variants
+VARIANT_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def build_variants(root):
+    """Write .gz/.br files next to every compressible file under `root`
+
+    Run at deploy time (`flask --app main build-assets`); Asset picks the files
+    up instead of compressing on first request. Returns the number written.
+    """
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(tuple(VARIANT_SUFFIXES.values())):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, body in compress_variants(data, mimetypes.guess_type(filename)[0]).items():
+                with open(path + VARIANT_SUFFIXES[encoding], 'wb') as f:
+                    f.write(body)
+                written += 1
+    return written
+
+
+def load_variants(path, stat):
+    """Precompressed variants of `path` written by build_variants, if not older than the file"""
+    variants = {}
+    for encoding, suffix in VARIANT_SUFFIXES.items():
+        try:
+            if os.stat(path + suffix).st_mtime < stat.st_mtime:
+                continue
+            with open(path + suffix, 'rb') as f:
+                variants[encoding] = f.read()
+        except OSError:
+            continue
+    return variants
+
+
+def pick_encoding(accept_encodings, variants):
+    """Best precompressed variant the client accepts (brotli first), or None"""
+    for encoding in ('br', 'gzip'):
+        if encoding in variants and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class Asset:
+    """One static file version with its fingerprint and compressed variants"""
+
+    def __init__(self, name, path, stat):
+        self.name = name
+        self.path = path
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.digest = fingerprint(data)
+        self.url_name = fingerprinted_name(name, self.digest)
+        # Large files are streamed from disk instead of being kept in memory
+        self.data = data if self.size <= MAX_MEMORY_ASSET else None
+        if self.data is None:
+            self.variants = {}
+        else:
+            # Prefer the deploy-time files; compress here only if they are missing
+            self.variants = load_variants(path, stat) or compress_variants(data, self.mimetype)
+
+
+class AssetManifest:
+    """Fingerprints of the files under `root`, refreshed when a file changes on disk"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        path = os.path.abspath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    def get(self, name):
+        """Current Asset for a file name relative to root, or None if it does not exist"""
+        path = self._path(name)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        asset = self._assets.get(name)
+        if asset is None or asset.mtime != stat.st_mtime or asset.size != stat.st_size:
+            asset = Asset(name, path, stat)
+            with self._lock:
+                self._assets[name] = asset
+        return asset
+
+    def url_name(self, name):
+        asset = self.get(name)
+        return asset.url_name if asset else name
+
+    def resolve(self, url_name):
+        """(asset, is_current) for a fingerprinted name; asset is None if the file is unknown"""
+        root, ext = os.path.splitext(url_name)
+        base, _, digest = root.rpartition('.')
+        if not base:
+            return None, False
+        asset = self.get(base + ext)
+        if asset is None:
+            return None, False
+        return asset, asset.digest == digest
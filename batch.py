@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+PPT Generator Batch Renderer
+Renders directories or globs of JSON decks to .pptx without the web server
+
+Usage:
+  python batch.py decks/ -o output/
+  python batch.py "decks/**/*.json" -o output/ -w 8 --profile small
+  python batch.py decks/ -o output/ --watch
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+MANIFEST_NAME = '.pptgen-manifest.json'
+
+
+def find_inputs(patterns):
+    """Expand directories, globs and file paths into a sorted list of JSON files"""
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found.update(glob.glob(os.path.join(pattern, '*.json')))
+        elif os.path.isfile(pattern):
+            found.add(pattern)
+        else:
+            found.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    return sorted(os.path.abspath(p) for p in found)
+
+
+def content_hash(path, profile):
+    """Hash of the input file and the options that affect its output"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        h.update(f.read())
+    h.update(profile.encode())
+    return h.hexdigest()
+
+
+def load_deck(path):
+    """Read a deck file as (content, file_name, jain_data)
+
+    Accepts plain content ({"meta", "slides"}) or the /generate_ppt request
+    body ({"json_data", "file_name", "jain_data"}).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    default_name = os.path.splitext(os.path.basename(path))[0]
+    if 'json_data' in data:
+        content = data['json_data']
+        if isinstance(content, str):
+            content = json.loads(content)
+        return content, data.get('file_name', default_name), data.get('jain_data')
+    return data, default_name, None
+
+
+def render_file(input_path, output_path, profile):
+    """Render one deck (runs in a worker process)
+
+    Returns a dict with the slide count, output size and render time, or the error.
+    """
+    from renderer import build_presentation
+    from save_engine import save_presentation
+
+    start = time.perf_counter()
+    try:
+        content, _, jain_data = load_deck(input_path)
+        if 'meta' not in content or 'slides' not in content:
+            raise KeyError('meta and slides')
+        prs = build_presentation(content, jain_data)
+        save_presentation(prs, output_path, profile)
+        return {
+            'input': input_path,
+            'output': output_path,
+            'slides': len(prs.slides),
+            'bytes': os.path.getsize(output_path),
+            'seconds': time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {'input': input_path, 'output': output_path, 'error': f"{type(e).__name__}: {e}"}
+
+
+def input_root(inputs):
+    """Deepest directory containing every input"""
+    if not inputs:
+        return None
+    return os.path.commonpath([os.path.dirname(p) for p in inputs])
+
+
+def output_path_for(input_path, output_dir, root=None):
+    """Output .pptx path for an input file (next to it when no output dir is given)
+
+    Under an output dir the input's path relative to `root` is kept, so decks
+    with the same name in different folders do not overwrite each other.
+    """
+    if not output_dir:
+        return os.path.splitext(input_path)[0] + '.pptx'
+    name = os.path.relpath(input_path, root) if root else os.path.basename(input_path)
+    return os.path.join(output_dir, os.path.splitext(name)[0] + '.pptx')
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def run_batch(inputs, output_dir, profile, workers, force=False, executor=None, root=None):
+    """Render every stale input and return a summary dict
+
+    `root` is the directory output paths are made relative to; it defaults
+    to the common directory of `inputs`.
+    """
+    manifest_dir = output_dir or os.getcwd()
+    manifest_path = os.path.join(manifest_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+
+    root = root or input_root(inputs)
+    jobs = {}
+    skipped = 0
+    for input_path in inputs:
+        output_path = output_path_for(input_path, output_dir, root)
+        digest = content_hash(input_path, profile)
+        if not force and manifest.get(output_path) == digest and os.path.exists(output_path):
+            skipped += 1
+            continue
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        jobs[input_path] = (output_path, digest)
+
+    summary = {'rendered': 0, 'skipped': skipped, 'failed': 0, 'slides': 0, 'bytes': 0, 'render_seconds': 0.0}
+    start = time.perf_counter()
+
+    own_executor = executor is None and bool(jobs)
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(render_file, path, out, profile) for path, (out, _) in jobs.items()]
+        for future in as_completed(futures):
+            result = future.result()
+            name = os.path.relpath(result['input'])
+            if 'error' in result:
+                summary['failed'] += 1
+                manifest.pop(result['output'], None)
+                print(f"❌ {name}: {result['error']}")
+                continue
+            summary['rendered'] += 1
+            summary['slides'] += result['slides']
+            summary['bytes'] += result['bytes']
+            summary['render_seconds'] += result['seconds']
+            manifest[result['output']] = jobs[result['input']][1]
+            print(f"✅ {name} → {os.path.relpath(result['output'])} "
+                  f"({result['slides']} slides, {result['seconds'] * 1000:.0f}ms)")
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    summary['elapsed'] = time.perf_counter() - start
+    if jobs:
+        save_manifest(manifest_path, manifest)
+    return summary
+
+
+def print_summary(summary):
+    elapsed = summary['elapsed']
+    print()
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"Rendered: {summary['rendered']}  Skipped (up to date): {summary['skipped']}  Failed: {summary['failed']}")
+    print(f"Slides: {summary['slides']}  Output: {summary['bytes'] / (1024 * 1024):.2f} MB  Wall time: {elapsed:.2f}s")
+    if elapsed > 0 and summary['rendered']:
+        print(f"Throughput: {summary['rendered'] / elapsed:.2f} decks/s, {summary['slides'] / elapsed:.1f} slides/s "
+              f"(avg {summary['render_seconds'] / summary['rendered'] * 1000:.0f}ms per deck)")
+
+
+def watch(patterns, output_dir, profile, workers, interval):
+    """Poll the inputs and re-render decks whose content changed"""
+    print(f"👀 Watching for changes every {interval}s (Ctrl+C to stop)")
+    mtimes = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            inputs = find_inputs(patterns)
+            current = {}
+            for path in inputs:
+                try:
+                    current[path] = os.path.getmtime(path)
+                except OSError:
+                    pass
+            changed = [path for path, mtime in current.items() if mtimes.get(path) != mtime]
+            mtimes = current
+            if changed:
+                summary = run_batch(changed, output_dir, profile, workers, executor=executor,
+                                    root=input_root(inputs))
+                if summary['rendered'] or summary['failed']:
+                    print_summary(summary)
+            time.sleep(interval)
+
+
+def main(argv=None):
+    from save_engine import SAVE_PROFILES, DEFAULT_SAVE_PROFILE
+
+    parser = argparse.ArgumentParser(description='Render JSON decks to .pptx files in bulk.')
+    parser.add_argument('inputs', nargs='+', help='JSON files, directories or glob patterns')
+    parser.add_argument('-o', '--output', help='output directory (default: next to each input)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('--profile', choices=sorted(SAVE_PROFILES), default=DEFAULT_SAVE_PROFILE,
+                        help='output compression profile')
+    parser.add_argument('-f', '--force', action='store_true', help='re-render even if outputs are up to date')
+    parser.add_argument('--watch', action='store_true', help='keep running and re-render on change')
+    parser.add_argument('--interval', type=float, default=1.0, help='watch polling interval in seconds')
+    args = parser.parse_args(argv)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        args.output = os.path.abspath(args.output)
+
+    inputs = find_inputs(args.inputs)
+    if not inputs and not args.watch:
+        print("❌ No JSON files found")
+        return 1
+
+    summary = run_batch(inputs, args.output, args.profile, args.workers, force=args.force)
+    print_summary(summary)
+
+    if args.watch:
+        try:
+            watch(args.inputs, args.output, args.profile, args.workers, args.interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import numpy as np
+
+# Upper bound on points per series once a chart block has been downsampled
+DEFAULT_MAX_POINTS = 200
+MIN_POINTS = 3  # LTTB keeps the first and last point plus at least one bucket
+DEFAULT_MAX_SLICES = 8
+
+AGGREGATE_FUNCS = ('sum', 'mean', 'min', 'max', 'count')
+
+
+def _to_float_array(values):
+    """Convert a list of numbers (None allowed) to a float array with NaN gaps"""
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _to_list(array):
+    """Convert a float array back to plain Python values, NaN becomes None"""
+    return [None if np.isnan(v) else v for v in array.tolist()]
+
+
+def group_by(keys, values, func='sum'):
+    """Aggregate `values` per distinct key, keeping first-appearance key order
+
+    Returns (unique_keys, aggregated_values) as numpy arrays.
+    """
+    if func not in AGGREGATE_FUNCS:
+        raise ValueError(f"Unknown aggregate: {func}")
+
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    uniq, first_idx, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    valid = ~np.isnan(values)
+    counts = np.bincount(inverse[valid], minlength=len(uniq)).astype(float)
+
+    if func == 'count':
+        out = counts
+    elif func in ('sum', 'mean'):
+        out = np.bincount(inverse[valid], weights=values[valid], minlength=len(uniq))
+        if func == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out = out / counts
+    else:
+        fill = np.inf if func == 'min' else -np.inf
+        out = np.full(len(uniq), fill)
+        ufunc = np.minimum if func == 'min' else np.maximum
+        ufunc.at(out, inverse[valid], values[valid])
+        out[counts == 0] = np.nan
+
+    order = np.argsort(first_idx)
+    return uniq[order], out[order]
+
+
+def bucket_aggregate(values, n_buckets, func='mean'):
+    """Reduce `values` to `n_buckets` contiguous buckets
+
+    Returns (bucket_start_indices, aggregated_values).
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= n_buckets:
+        return np.arange(n), values
+
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype(float), starts)
+    filled = np.where(valid, values, 0.0)
+
+    if func == 'count':
+        out = counts
+    elif func in ('sum', 'mean'):
+        out = np.add.reduceat(filled, starts)
+        if func == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out = out / counts
+    elif func in ('min', 'max'):
+        fill = np.inf if func == 'min' else -np.inf
+        ufunc = np.minimum if func == 'min' else np.maximum
+        out = ufunc.reduceat(np.where(valid, values, fill), starts)
+        out[counts == 0] = np.nan
+    else:
+        raise ValueError(f"Unknown aggregate: {func}")
+    return starts, out
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling
+
+    Returns the sorted indices of at most `threshold` points that preserve
+    the visual shape of the (x, y) series. Bucket averages are computed in a
+    single vectorized pass; only the point selection walks the buckets.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    n_buckets = threshold - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    # Average of each bucket, shifted by one so entry i is the "next" bucket
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.append(avg_y[1:], y[n - 1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def multi_series_lttb_indices(x, ys, threshold):
+    """LTTB over several series sharing one x axis
+
+    Each series is scaled to [0, 1] and a point's triangle area is summed over
+    all series, so the `threshold` shared points keep every series' shape.
+    """
+    x = np.asarray(x, dtype=float)
+    ys = np.nan_to_num(np.asarray(ys, dtype=float))
+    n = ys.shape[1]
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    low = ys.min(axis=1, keepdims=True)
+    span = ys.max(axis=1, keepdims=True) - low
+    ys = (ys - low) / np.where(span == 0, 1, span)
+
+    n_buckets = threshold - 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(ys[:, :n - 1], edges[:-1], axis=1) / counts
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.concatenate([avg_y[:, 1:], ys[:, n - 1:]], axis=1)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], ys[:, a:a + 1]
+        area = np.abs((ax - next_x[i]) * (ys[:, lo:hi] - ay)
+                      - (ax - x[lo:hi]) * (next_y[:, i:i + 1] - ay)).sum(axis=0)
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def prepare_category_chart(block, chart_type):
+    """Aggregate and downsample a line/bar/pie block
+
+    Returns (categories, [(series_name, values), ...]) with plain Python values.
+    """
+    series = block.get("series", [])
+    if not series:
+        return [], []
+
+    names = [s.get("name", f"Series {i + 1}") for i, s in enumerate(series)]
+    arrays = [_to_float_array(s.get("values", [])) for s in series]
+    length = min(len(a) for a in arrays)
+    if block.get("categories"):
+        # Values without a category cannot be plotted
+        length = min(length, len(block["categories"]))
+    arrays = [a[:length] for a in arrays]
+    categories = np.asarray(block.get("categories") or list(range(1, length + 1)))[:length]
+
+    func = block.get("aggregate", "sum" if chart_type == "pie" else None)
+    if func:
+        grouped = [group_by(categories, a, func) for a in arrays]
+        categories = grouped[0][0]
+        arrays = [values for _, values in grouped]
+
+    if chart_type == "pie":
+        # A pie only has one series; fold the smallest slices into "Other"
+        values = arrays[0]
+        max_slices = block.get("max_slices", DEFAULT_MAX_SLICES)
+        if len(values) > max_slices:
+            order = np.argsort(-np.nan_to_num(values), kind='stable')
+            keep = np.sort(order[:max_slices - 1])
+            other = np.nansum(values[order[max_slices - 1:]])
+            categories = np.append(categories[keep].astype(object), "Other")
+            values = np.append(values[keep], other)
+        return categories.tolist(), [(names[0], _to_list(values))]
+
+    max_points = max(MIN_POINTS, int(block.get("max_points", DEFAULT_MAX_POINTS)))
+    if len(arrays[0]) > max_points:
+        if chart_type == "line":
+            # Union of the points each series needs to keep its shape, cut
+            # back to max_points by a joint LTTB pass when the series disagree
+            x = np.arange(len(categories))
+            idx = np.unique(np.concatenate([lttb_indices(x, a, max_points) for a in arrays]))
+            if len(idx) > max_points:
+                idx = idx[multi_series_lttb_indices(idx, [a[idx] for a in arrays], max_points)]
+            categories = categories[idx]
+            arrays = [a[idx] for a in arrays]
+        else:
+            bucket_func = block.get("downsample", "mean")
+            starts = None
+            buckets = []
+            for a in arrays:
+                starts, values = bucket_aggregate(a, max_points, bucket_func)
+                buckets.append(values)
+            categories = categories[starts]
+            arrays = buckets
+
+    return categories.tolist(), [(name, _to_list(a)) for name, a in zip(names, arrays)]
+
+
+def prepare_xy_chart(block):
+    """Downsample a scatter block
+
+    Each series gives either "x" and "y" lists or "points" as [x, y] pairs.
+    Returns [(series_name, [(x, y), ...]), ...].
+    """
+    max_points = max(MIN_POINTS, int(block.get("max_points", DEFAULT_MAX_POINTS)))
+    prepared = []
+    for i, s in enumerate(block.get("series", [])):
+        if "points" in s:
+            pts = np.asarray(s["points"], dtype=float).reshape(-1, 2)
+            x, y = pts[:, 0], pts[:, 1]
+        else:
+            x, y = _to_float_array(s.get("x", [])), _to_float_array(s.get("y", []))
+            length = min(len(x), len(y))
+            x, y = x[:length], y[:length]
+
+        keep = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[keep], y[keep]
+        if len(x) > max_points:
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+            idx = lttb_indices(x, y, max_points)
+            x, y = x[idx], y[idx]
+        prepared.append((s.get("name", f"Series {i + 1}"), list(zip(x.tolist(), y.tolist()))))
+    return prepared
@@ -0,0 +1,103 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.oxml import parse_xml
+from pptx.util import Inches, Pt
+
+from colors import to_rgb
+
+# Pre-rendered title slide elements of stored college profiles: the logo
+# picture and college name text box are built once per profile version and
+# copied into each deck as XML
+
+DEFAULT_LOGO_PATH = 'static/college.png'
+
+FRAGMENT_CACHE_SIZE = int(os.getenv('PPT_COLLEGE_FRAGMENT_CACHE', 256))
+
+R_EMBED = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'
+BLIP = '{http://schemas.openxmlformats.org/drawingml/2006/main}blip'
+
+
+class TitleFragment:
+    """Static shapes of a college title slide, ready to be appended to a slide"""
+
+    def __init__(self, shapes, logo, title_color, header_color):
+        self.shapes = shapes  # serialized p:pic / p:sp elements
+        self.logo = logo      # image blob referenced by the picture, or None
+        self.title_color = title_color
+        self.header_color = header_color
+
+    def apply(self, slide):
+        """Copy the pre-rendered shapes onto `slide`"""
+        rId = None
+        if self.logo is not None:
+            _, rId = slide.part.get_or_add_image_part(io.BytesIO(self.logo))
+        spTree = slide.shapes._spTree
+        for xml in self.shapes:
+            element = parse_xml(xml)
+            element[0][0].set('id', str(slide.shapes._next_shape_id))  # nvSpPr/nvPicPr -> cNvPr
+            blip = element.find(f'.//{BLIP}')
+            if blip is not None:
+                blip.set(R_EMBED, rId)
+            spTree.insert_element_before(element, 'p:extLst')
+
+
+def build_fragment(profile):
+    """Render the logo and college name of `profile` on a scratch slide and serialize them"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide_width = prs.slide_width.inches
+    left_layout = profile.layout == 'left'
+
+    logo = profile.logo if profile.has_logo else None
+    if logo is None and os.path.exists(DEFAULT_LOGO_PATH):
+        with open(DEFAULT_LOGO_PATH, 'rb') as f:
+            logo = f.read()
+    if logo is not None:
+        pic = slide.shapes.add_picture(io.BytesIO(logo), Inches(0.5), Inches(0.5), height=Inches(1.2))
+        if not left_layout:
+            pic.left = int((prs.slide_width - pic.width) / 2)
+
+    name_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(slide_width - 2), Inches(0.5))
+    name_tf = name_box.text_frame
+    name_tf.text = profile.name
+    name_tf.word_wrap = True
+    p = name_tf.paragraphs[0]
+    p.alignment = PP_ALIGN.LEFT if left_layout else PP_ALIGN.CENTER
+    p.font.size = Pt(24)
+    p.font.bold = True
+    p.font.color.rgb = RGBColor(*to_rgb(profile.name_color or '#000080'))
+
+    return TitleFragment(
+        shapes=[etree.tostring(shape._element) for shape in slide.shapes],
+        logo=logo,
+        title_color=RGBColor(*to_rgb(profile.title_color or '#000000')),
+        header_color=RGBColor(*to_rgb(profile.header_color or '#C8C8C8')),
+    )
+
+
+_fragments = OrderedDict()
+_fragments_lock = threading.Lock()
+
+
+def title_fragment(profile):
+    """Cached TitleFragment for the current version of `profile`"""
+    key = (profile.id, profile.updated_at)
+    with _fragments_lock:
+        fragment = _fragments.get(key)
+        if fragment is not None:
+            _fragments.move_to_end(key)
+            return fragment
+
+    fragment = build_fragment(profile)
+    with _fragments_lock:
+        _fragments[key] = fragment
+        while len(_fragments) > FRAGMENT_CACHE_SIZE:
+            _fragments.popitem(last=False)
+    return fragment
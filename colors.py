@@ -0,0 +1,43 @@
+import re
+
+# Named colors accepted anywhere a block takes a color
+NAMED_COLORS = {
+    'red': (255, 0, 0),
+    'blue': (0, 0, 255),
+    'green': (0, 128, 0),
+    'yellow': (255, 255, 0),
+    'orange': (255, 165, 0),
+    'purple': (128, 0, 128),
+    'pink': (255, 192, 203),
+    'brown': (165, 42, 42),
+    'gray': (128, 128, 128),
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+}
+
+
+def to_rgb(color_spec):
+    """Parse color from various formats: 'red', '#FF0000', or [255, 0, 0] into an (r, g, b) tuple"""
+    if isinstance(color_spec, list) and len(color_spec) == 3:
+        return tuple(color_spec)
+    elif isinstance(color_spec, str):
+        if color_spec.startswith('#'):
+            # Hex color
+            color_spec = color_spec.lstrip('#')
+            return tuple(int(color_spec[i:i+2], 16) for i in (0, 2, 4))
+        else:
+            return NAMED_COLORS.get(color_spec.lower(), (0, 0, 0))
+    return (0, 0, 0)  # Default black
+
+
+def to_hex(color_spec):
+    """CSS hex string for a color spec"""
+    return '#%02X%02X%02X' % to_rgb(color_spec)
+
+
+def parse_color(color_spec):
+    """Strict to_rgb for stored settings: '#RRGGBB' or a named color, else ValueError"""
+    spec = str(color_spec).strip()
+    if not (re.fullmatch(r'#[0-9A-Fa-f]{6}', spec) or spec.lower() in NAMED_COLORS):
+        raise ValueError(f"Invalid color {color_spec!r}: use #RRGGBB or a color name")
+    return to_rgb(spec)
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import db
+
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///pptgen.db')
+
+# Optional read-only database (e.g. a Postgres replica) for analytics pages.
+# When unset, reads use a separate read-only engine on DATABASE_URL so dashboard
+# queries never hold connections from the write pool.
+READ_DATABASE_URL = os.getenv('READ_DATABASE_URL') or DATABASE_URL
+READ_SPLIT = os.getenv('DB_READ_SPLIT', '1') == '1'
+
+# Connection pool (server databases)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))    # seconds
+POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'
+
+# SQLite tuning
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+
+READ_BIND = 'read'
+
+
+def is_sqlite(url):
+    return url.startswith('sqlite')
+
+
+def engine_options(url, read_only=False):
+    """SQLAlchemy create_engine options for `url`"""
+    if is_sqlite(url):
+        # The busy timeout is also set in the connect hook; this covers the
+        # sqlite3 driver's own locking before the PRAGMA runs
+        return {'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000}}
+
+    options = {
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'pool_recycle': POOL_RECYCLE,
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_pre_ping': POOL_PRE_PING,
+    }
+    if read_only and url.startswith('postgres'):
+        options['connect_args'] = {'options': '-c default_transaction_read_only=on'}
+    return options
+
+
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Enable WAL, busy timeout and synchronous mode on every SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+    cursor.execute(f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}')
+    cursor.close()
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.execute('PRAGMA query_only=ON')
+
+
+def init_database(app):
+    """Configure engines for `app` and bind the shared SQLAlchemy instance"""
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(DATABASE_URL)
+    if READ_SPLIT:
+        app.config['SQLALCHEMY_BINDS'] = {
+            READ_BIND: {'url': READ_DATABASE_URL, **engine_options(READ_DATABASE_URL, read_only=True)},
+        }
+    db.init_app(app)
+
+    if READ_SPLIT:
+        with app.app_context():
+            event.listen(db.engines[READ_BIND], 'connect', _set_query_only)
+
+
+@contextmanager
+def read_session():
+    """Session on the read-only engine (or the regular session without a read split)"""
+    if not READ_SPLIT:
+        yield db.session
+        return
+    session = Session(bind=db.engines[READ_BIND])
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,89 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+import admission
+
+# Background jobs for heavy-lane decks
+#
+# Large decks are rendered on a small thread pool in the worker process, so
+# the request returns 202 right away instead of holding a worker for the
+# whole render. Job status and output live in JOB_DIR as <id>.json and
+# <id>.pptx, so whichever worker a client polls can answer.
+
+JOB_DIR = os.getenv('PPT_JOB_DIR', os.path.join(tempfile.gettempdir(), 'pptgen-jobs'))
+JOB_TTL = int(os.getenv('PPT_JOB_TTL', 3600))  # seconds a finished job's file is kept
+POLL_SECONDS = 2  # Retry-After sent while a job is running
+
+JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """The process's heavy-lane pool, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=max(1, admission.HEAVY_SLOTS),
+                                           thread_name_prefix='heavy-lane')
+        return _executor
+
+
+def paths(job_id):
+    """(output .pptx, status .json) paths of a job"""
+    if not JOB_ID.match(job_id or ''):
+        raise ValueError(f"Invalid job id: {job_id}")
+    base = os.path.join(JOB_DIR, job_id)
+    return base + '.pptx', base + '.json'
+
+
+def create(**fields):
+    """Register a running job and return its id"""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    cleanup()
+    job_id = uuid.uuid4().hex
+    write_status(job_id, 'running', **fields)
+    return job_id
+
+
+def write_status(job_id, status, **fields):
+    _, status_path = paths(job_id)
+    current = read_status(job_id) or {}
+    current.update(fields, status=status, updated=time.time())
+    tmp_path = f"{status_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(current, f)
+    os.replace(tmp_path, status_path)
+
+
+def read_status(job_id):
+    """Status dict of a job, or None if it is unknown or expired"""
+    _, status_path = paths(job_id)
+    try:
+        with open(status_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def cleanup(now=None):
+    """Remove job files older than JOB_TTL"""
+    cutoff = (now or time.time()) - JOB_TTL
+    try:
+        entries = os.scandir(JOB_DIR)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
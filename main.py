@@ -1,37 +1,140 @@
+import time
+_startup_begin = time.perf_counter()
+
+import io
 import json
 import os
+import subprocess
+import sys
 import tempfile
-import time
 from datetime import datetime, date
 from flask import Flask, render_template, request, send_file, jsonify, redirect, url_for
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT
-from pptx.enum.dml import MSO_THEME_COLOR
 from werkzeug.utils import secure_filename
-from models import db, Generation, Student, get_analytics_summary
+from models import db, Generation, Student, CollegeProfile, COLLEGE_LAYOUTS, get_analytics_summary, upgrade_schema
+from save_engine import SAVE_PROFILES, DEFAULT_SAVE_PROFILE
+from memory_monitor import PeakMemoryMonitor
+from database import init_database, read_session
+import admission
+import jobs
+from colors import parse_color, to_hex
+from assets import AssetManifest, IMMUTABLE_MAX_AGE, build_variants, compress_variants, fingerprint, pick_encoding
+from suggest import FIELDS as SUGGEST_FIELDS, DEFAULT_LIMIT as SUGGEST_LIMIT, generation_values, index_rows, suggest_index
+
+# Startup phase timings in milliseconds (python-pptx, lxml and NumPy are only
+# imported by renderer.py on the first render)
+STARTUP_TIMINGS = {'imports_ms': round((time.perf_counter() - _startup_begin) * 1000, 1)}
+_phase_begin = time.perf_counter()
 
 app = Flask(__name__)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB default
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///pptgen.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Admin credentials (change these!)
 ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'changeme123')
 
-FONT = "Calibri"
+# Schema setup: run `flask --app main init-db` as a deploy step and set
+# PPT_AUTO_INIT_DB=0, otherwise tables are created on the first DB request
+AUTO_INIT_DB = os.getenv('PPT_AUTO_INIT_DB', '1') == '1'
+
+# Cold import budget checked by `flask --app main check-startup`
+IMPORT_BUDGET_MS = float(os.getenv('PPT_IMPORT_BUDGET_MS', 1500))
+LAZY_MODULES = ('pptx', 'lxml', 'numpy', 'renderer', 'charts')
+
+# Decks with at least this many slides are streamed into the package slide by
+# slide instead of being held in memory until save
+STREAM_SLIDE_THRESHOLD = int(os.getenv('PPT_STREAM_SLIDE_THRESHOLD', 200))
+
+# Run the package size optimizer (unused layouts, duplicate media, redundant
+# run properties) unless the request says otherwise
+OPTIMIZE_DEFAULT = os.getenv('PPT_OPTIMIZE', '0') == '1'
+
+# Initialize database (engines, pooling and the read-only analytics engine)
+init_database(app)
+
+STARTUP_TIMINGS['app_setup_ms'] = round((time.perf_counter() - _phase_begin) * 1000, 1)
+_schema_ready = False
+
+
+def ensure_schema():
+    """Create database tables once per process on first use"""
+    global _schema_ready
+    if _schema_ready or not AUTO_INIT_DB:
+        return
+    begin = time.perf_counter()
+    upgrade_schema()
+    STARTUP_TIMINGS['schema_ms'] = round((time.perf_counter() - begin) * 1000, 1)
+    _schema_ready = True
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create database tables and apply column upgrades"""
+    upgrade_schema()
+    print("✅ Database tables created")
+
+
+def measure_cold_import(runs=3):
+    """Import main in fresh interpreters; returns (best ms, lazy modules that got loaded)"""
+    probe = (
+        "import json, sys, time; t = time.perf_counter(); import main; "
+        "print(json.dumps({'ms': (time.perf_counter() - t) * 1000, "
+        f"'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))"
+    )
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return min(sample['ms'] for sample in samples), samples[-1]['loaded']
+
+
+@app.cli.command('check-startup')
+def check_startup_command():
+    """Measure a cold import of the app and fail if it is over budget"""
+    best, loaded = measure_cold_import()
+    loaded = ', '.join(loaded)
+    print(f"⏱️  Cold import: {best:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms)")
+    if loaded:
+        print(f"❌ Heavy modules imported at startup: {loaded}")
+        sys.exit(1)
+    if best > IMPORT_BUDGET_MS:
+        print("❌ Import time over budget")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Precompress static files (gzip and brotli) as a deploy step"""
+    written = build_variants(app.static_folder)
+    print(f"✅ Wrote {written} precompressed static files")
+
+
+@app.cli.command('cost-report')
+def cost_report_command():
+    """Compare estimated and actual render cost of past generations"""
+    upgrade_schema()
+    rows = db.session.query(Generation.lane, Generation.estimated_cost, Generation.actual_cost).filter(
+        Generation.status == 'success', Generation.estimated_cost > 0, Generation.actual_cost.isnot(None)).all()
+    if not rows:
+        print("No generations with cost data yet")
+        return
+
+    for lane in (admission.FAST_LANE, admission.HEAVY_LANE):
+        ratios = sorted(actual / estimated for row_lane, estimated, actual in rows if row_lane == lane)
+        if ratios:
+            print(f"{lane:>5} lane: {len(ratios)} decks, actual/estimated "
+                  f"p50 {ratios[len(ratios) // 2]:.2f}, p90 {ratios[int(len(ratios) * 0.9)]:.2f}")
 
-# Initialize database
-db.init_app(app)
+    ratios = sorted(actual / estimated for _, estimated, actual in rows)
+    median = ratios[len(ratios) // 2]
+    print(f"Suggested PPT_COST_UNIT_SECONDS={admission.COST_UNIT_SECONDS * median:.4f} "
+          f"(currently {admission.COST_UNIT_SECONDS})")
 
-# Create tables
-with app.app_context():
-    db.create_all()
 
 # Add Jinja2 filter for timezone conversion
 @app.template_filter('to_local')
@@ -40,37 +143,65 @@ def to_local_filter(utc_time):
     from models import to_local_time
     return to_local_time(utc_time)
 
-# Helper function to parse color
-def parse_color(color_spec):
-    """Parse color from various formats: 'red', '#FF0000', or [255, 0, 0]"""
-    if isinstance(color_spec, list) and len(color_spec) == 3:
-        return RGBColor(*color_spec)
-    elif isinstance(color_spec, str):
-        if color_spec.startswith('#'):
-            # Hex color
-            color_spec = color_spec.lstrip('#')
-            return RGBColor(*[int(color_spec[i:i+2], 16) for i in (0, 2, 4)])
-        else:
-            # Named colors
-            color_map = {
-                'red': RGBColor(255, 0, 0),
-                'blue': RGBColor(0, 0, 255),
-                'green': RGBColor(0, 128, 0),
-                'yellow': RGBColor(255, 255, 0),
-                'orange': RGBColor(255, 165, 0),
-                'purple': RGBColor(128, 0, 128),
-                'pink': RGBColor(255, 192, 203),
-                'brown': RGBColor(165, 42, 42),
-                'gray': RGBColor(128, 128, 128),
-                'black': RGBColor(0, 0, 0),
-                'white': RGBColor(255, 255, 255),
-            }
-            return color_map.get(color_spec.lower(), RGBColor(0, 0, 0))
-    return RGBColor(0, 0, 0)  # Default black
+# Fingerprinted static assets served from /assets with immutable caching
+asset_manifest = AssetManifest(app.static_folder)
+
+# Templates without per-request data, rendered once per process
+_static_pages = {}
+
+
+@app.template_global()
+def asset_url(filename):
+    """URL of a static file that changes whenever the file's content does"""
+    return url_for('asset', filename=asset_manifest.url_name(filename))
+
+
+def encoded_response(data, variants, mimetype, etag, max_age=None):
+    """Response using the best precompressed variant, with ETag revalidation"""
+    encoding = pick_encoding(request.accept_encodings, variants)
+    response = app.response_class(variants[encoding] if encoding else data, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+def render_static_page(template):
+    """Serve a template that has no per-request data from memory"""
+    page = _static_pages.get(template)
+    if page is None:
+        html = render_template(template).encode('utf-8')
+        page = (html, compress_variants(html, 'text/html'), fingerprint(html))
+        if not app.debug:
+            _static_pages[template] = page
+    html, variants, etag = page
+    return encoded_response(html, variants, 'text/html; charset=utf-8', etag)
+
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    found, current = asset_manifest.resolve(filename)
+    if found is None:
+        return jsonify({'error': 'Not found'}), 404
+    if not current:
+        # Stale fingerprint from an older page: point at the current version
+        return redirect(url_for('asset', filename=found.url_name))
+    if found.data is None:
+        return send_file(found.path, mimetype=found.mimetype, etag=found.digest,
+                         max_age=IMMUTABLE_MAX_AGE, conditional=True)
+    return encoded_response(found.data, found.variants, found.mimetype, found.digest, IMMUTABLE_MAX_AGE)
+
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_static_page('index.html')
 
 
 @app.route('/health')
@@ -79,7 +210,8 @@ def health():
     return jsonify({
         'status': 'healthy',
         'service': 'ppt-generator',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'startup': STARTUP_TIMINGS
     })
 
 
@@ -116,25 +248,29 @@ def admin_dashboard():
     if not session.get('admin_logged_in'):
         return redirect(url_for('admin_login'))
     
-    # Get analytics data
-    stats = get_analytics_summary()
-    
-    # Convert timestamps to local time and prepare student data for JSON serialization
-    for gen in stats.get('recent_generations', []):
-        if hasattr(gen, 'timestamp') and gen.timestamp:
-            gen.local_timestamp = to_local_time(gen.timestamp)
-        # Convert students to dictionaries for JSON serialization
-        if hasattr(gen, 'students'):
-            gen.students_json = [{'name': s.name, 'usn': s.usn} for s in gen.students]
+    ensure_schema()
     
-    # Prepare chart data
-    chart_dates = [str(d[0]) for d in stats['daily_counts']]
-    chart_counts = [d[1] for d in stats['daily_counts']]
-    
-    return render_template('admin_dashboard.html', 
-                         stats=stats,
-                         chart_dates=chart_dates,
-                         chart_counts=chart_counts)
+    # Analytics reads go to the read-only engine so they never contend with generation writes
+    with read_session() as session:
+        # Get analytics data
+        stats = get_analytics_summary(session)
+        
+        # Convert timestamps to local time and prepare student data for JSON serialization
+        for gen in stats.get('recent_generations', []):
+            if hasattr(gen, 'timestamp') and gen.timestamp:
+                gen.local_timestamp = to_local_time(gen.timestamp)
+            # Convert students to dictionaries for JSON serialization
+            if hasattr(gen, 'students'):
+                gen.students_json = [{'name': s.name, 'usn': s.usn} for s in gen.students]
+        
+        # Prepare chart data
+        chart_dates = [str(d[0]) for d in stats['daily_counts']]
+        chart_counts = [d[1] for d in stats['daily_counts']]
+        
+        return render_template('admin_dashboard.html', 
+                             stats=stats,
+                             chart_dates=chart_dates,
+                             chart_counts=chart_counts)
 
 
 @app.route('/admin/logout')
@@ -145,429 +281,333 @@ def admin_logout():
     return redirect(url_for('index'))
 
 
-def style(run, size=18, bold=False, italic=False, color=None, underline=False):
-    """Enhanced style function with more formatting options"""
-    run.font.name = FONT
-    run.font.size = Pt(size)
-    run.font.bold = bold
-    run.font.italic = italic
-    run.font.underline = underline
-    if color:
-        run.font.color.rgb = parse_color(color)
-    else:
-        run.font.color.rgb = RGBColor(0, 0, 0)
-
-def add_text(tf, text, level=0, size=18, bold=False, italic=False, color=None, align=None):
-    """Enhanced text function with alignment and formatting"""
-    p = tf.add_paragraph() if tf.text else tf.paragraphs[0]
-    p.text = text
-    p.level = level
-    if align:
-        alignment_map = {
-            'left': PP_ALIGN.LEFT,
-            'center': PP_ALIGN.CENTER,
-            'right': PP_ALIGN.RIGHT,
-            'justify': PP_ALIGN.JUSTIFY
-        }
-        p.alignment = alignment_map.get(align.lower(), PP_ALIGN.LEFT)
-    for r in p.runs:
-        style(r, size, bold, italic, color)
-
-def render_heading(tf, block):
-    """Render heading block"""
-    text = block.get("text", "")
-    level = block.get("level", 1)  # 1=large, 2=medium, 3=small
-    color = block.get("color")
-    align = block.get("align", "left")
-    
-    size_map = {1: 28, 2: 24, 3: 20}
-    size = size_map.get(level, 24)
-    
-    add_text(tf, text, level=0, size=size, bold=True, color=color, align=align)
-
-def render_paragraph(tf, block):
-    """Render styled paragraph"""
-    text = block.get("text", "")
-    size = block.get("size", 18)
-    color = block.get("color")
-    bold = block.get("bold", False)
-    italic = block.get("italic", False)
-    align = block.get("align", "left")
-    
-    add_text(tf, text, size=size, bold=bold, italic=italic, color=color, align=align)
 
-def render_bullets(tf, block):
-    """Enhanced bullet rendering with styles"""
-    items = block.get("items", [])
-    bullet_color = block.get("color")
-    
-    for item in items:
-        if isinstance(item, str):
-            add_text(tf, item, color=bullet_color)
-        else:
-            # Styled bullet
-            text = item.get("text", "")
-            bold = item.get("bold", True)
-            color = item.get("color", bullet_color)
-            add_text(tf, text, bold=bold, color=color)
-            
-            # Sub-points
-            for sub in item.get("subpoints", []):
-                if isinstance(sub, str):
-                    add_text(tf, sub, level=1, color=bullet_color)
-                else:
-                    sub_text = sub.get("text", "")
-                    sub_color = sub.get("color", bullet_color)
-                    add_text(tf, sub_text, level=1, color=sub_color)
-
-def render_table(slide, block, top=2.5):
-    """Render a table on the slide"""
-    rows = block.get("rows", [])
-    if not rows:
+def ensure_suggest_index():
+    """Build the autocomplete index from the database on first use, and refresh it when stale"""
+    if not suggest_index.is_stale():
         return
-    
-    num_rows = len(rows)
-    num_cols = len(rows[0]) if rows else 0
-    
-    # Position and size
-    left = Inches(block.get("left", 1))
-    top = Inches(block.get("top", top))
-    width = Inches(block.get("width", 8))
-    height = Inches(block.get("height", 0.4 * num_rows))
-    
-    # Create table
-    table = slide.shapes.add_table(num_rows, num_cols, left, top, width, height).table
-    
-    # Set column widths
-    col_widths = block.get("col_widths", [width.inches / num_cols] * num_cols)
-    for i, col_width in enumerate(col_widths[:num_cols]):
-        table.columns[i].width = Inches(col_width)
-    
-    # Fill table
-    header = block.get("header", True)
-    header_color = parse_color(block.get("header_color", [68, 114, 196]))  # Blue
-    header_text_color = parse_color(block.get("header_text_color", "white"))
-    
-    for row_idx, row_data in enumerate(rows):
-        for col_idx, cell_data in enumerate(row_data):
-            cell = table.cell(row_idx, col_idx)
-            
-            # Cell text
-            if isinstance(cell_data, dict):
-                cell.text = str(cell_data.get("text", ""))
-                cell_color = cell_data.get("color")
-                bg_color = cell_data.get("bg_color")
-            else:
-                cell.text = str(cell_data)
-                cell_color = None
-                bg_color = None
-            
-            # Format cell
-            cell.text_frame.paragraphs[0].font.size = Pt(block.get("font_size", 11))
-            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-            
-            # Header row styling
-            if header and row_idx == 0:
-                cell.text_frame.paragraphs[0].font.bold = True
-                cell.text_frame.paragraphs[0].font.color.rgb = header_text_color
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = header_color
-            elif bg_color:
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = parse_color(bg_color)
-            
-            if cell_color:
-                cell.text_frame.paragraphs[0].font.color.rgb = parse_color(cell_color)
-
-def render_text_box(slide, block):
-    """Render a text box with custom positioning and styling"""
-    text = block.get("text", "")
-    left = Inches(block.get("left", 1))
-    top = Inches(block.get("top", 3))
-    width = Inches(block.get("width", 6))
-    height = Inches(block.get("height", 1))
-    
-    # Create text box
-    text_box = slide.shapes.add_textbox(left, top, width, height)
-    tf = text_box.text_frame
-    tf.word_wrap = True
-    
-    p = tf.paragraphs[0]
-    p.text = text
-    
-    # Styling
-    font_size = block.get("font_size", 18)
-    bold = block.get("bold", False)
-    italic = block.get("italic", False)
-    color = block.get("color")
-    bg_color = block.get("bg_color")
-    align = block.get("align", "left")
-    
-    p.font.size = Pt(font_size)
-    p.font.bold = bold
-    p.font.italic = italic
-    if color:
-        p.font.color.rgb = parse_color(color)
-    
-    # Alignment
-    alignment_map = {
-        'left': PP_ALIGN.LEFT,
-        'center': PP_ALIGN.CENTER,
-        'right': PP_ALIGN.RIGHT,
-        'justify': PP_ALIGN.JUSTIFY
-    }
-    p.alignment = alignment_map.get(align.lower(), PP_ALIGN.LEFT)
-    
-    # Background color
-    if bg_color:
-        text_box.fill.solid()
-        text_box.fill.fore_color.rgb = parse_color(bg_color)
-
-def render_numbered_list(tf, block):
-    """Render numbered list"""
-    items = block.get("items", [])
-    start = block.get("start", 1)
-    color = block.get("color")
-    
-    for i, item in enumerate(items, start=start):
-        if isinstance(item, str):
-            add_text(tf, f"{i}. {item}", color=color)
-        else:
-            text = item.get("text", "")
-            item_color = item.get("color", color)
-            add_text(tf, f"{i}. {text}", color=item_color)
-
-def render_images(slide, block, top=2.5):
-    items = block["items"]
-    count = len(items)
-
-    if block["layout"] == "row":
-        width = 8 / count
-        for i, img in enumerate(items):
-            try:
-                slide.shapes.add_picture(
-                    img["path"],
-                    Inches(0.5 + i * width),
-                    Inches(top),
-                    width=Inches(width - 0.2)
-                )
-            except FileNotFoundError:
-                print(f"Warning: Image file not found at {img['path']}")
-
-    elif block["layout"] == "column":
-        height = 4 / count
-        for i, img in enumerate(items):
-            try:
-                slide.shapes.add_picture(
-                    img["path"],
-                    Inches(2),
-                    Inches(top + i * height),
-                    height=Inches(height - 0.2)
-                )
-            except FileNotFoundError:
-                print(f"Warning: Image file not found at {img['path']}")
-
-    elif block["layout"] == "grid":
-        cols = 2
-        rows = (count + 1) // 2
-        w, h = 4, 2
-        for idx, img in enumerate(items):
+    ensure_schema()
+    begin = time.perf_counter()
+    with read_session() as session:
+        suggest_index.load(index_rows(session))
+    print(f"🔎 Autocomplete index built in {(time.perf_counter() - begin) * 1000:.0f}ms: {suggest_index.stats()}")
+
+
+@app.route('/api/suggest')
+def api_suggest():
+    """Ranked autocomplete suggestions for a form field"""
+    field = request.args.get('field', '')
+    if field not in SUGGEST_FIELDS:
+        return jsonify({'error': f"Invalid field. Use one of: {', '.join(SUGGEST_FIELDS)}"}), 400
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', SUGGEST_LIMIT, type=int)
+    ensure_suggest_index()
+    return jsonify({'field': field, 'query': query, 'suggestions': suggest_index.suggest(field, query, limit)})
+
+
+# College profiles
+LOGO_TYPES = ('image/png', 'image/jpeg', 'image/gif')
+
+
+def resolve_college(jain_data):
+    """Fill jain_data from the stored college profile it references
+
+    Returns (jain_data, profile); profile is None when no college_id is given
+    or it is unknown.
+    """
+    if not (jain_data and jain_data.get('enabled') and jain_data.get('college_id')):
+        return jain_data, None
+    ensure_schema()
+    try:
+        profile = db.session.get(CollegeProfile, int(jain_data['college_id']))
+    except (TypeError, ValueError):
+        profile = None
+    if profile is None:
+        return jain_data, None
+    jain_data = dict(jain_data, college_name=profile.name, name_color=profile.name_color,
+                     title_color=profile.title_color, header_color=profile.header_color, layout=profile.layout)
+    if profile.has_logo:
+        jain_data['logo_url'] = url_for('college_logo', college_id=profile.id)
+    return jain_data, profile
+
+
+def _apply_college_form(profile):
+    """Copy submitted profile fields onto `profile`; returns an error message or None"""
+    name = request.form.get('name', profile.name)
+    if not name:
+        return 'name is required'
+    profile.name = name.strip()
+    for field in ('name_color', 'title_color', 'header_color'):
+        value = request.form.get(field, '').strip()
+        if value:
             try:
-                r, c = divmod(idx, cols)
-                slide.shapes.add_picture(
-                    img["path"],
-                    Inches(0.5 + c * w),
-                    Inches(top + r * h),
-                    width=Inches(w - 0.3)
-                )
-            except FileNotFoundError:
-                print(f"Warning: Image file not found at {img['path']}")
+                parse_color(value)
+            except ValueError as e:
+                return f"{field}: {e}"
+            setattr(profile, field, to_hex(value))
+    layout = request.form.get('layout', profile.layout or 'centered')
+    if layout not in COLLEGE_LAYOUTS:
+        return f"Invalid layout. Use one of: {', '.join(COLLEGE_LAYOUTS)}"
+    profile.layout = layout
+    logo = request.files.get('logo')
+    if logo is not None:
+        if logo.mimetype not in LOGO_TYPES:
+            return 'Logo must be a PNG, JPEG or GIF image'
+        data = logo.read()
+        from PIL import Image
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+        except Exception:
+            return 'Logo is not a readable PNG, JPEG or GIF image'
+        profile.logo = data
+        profile.logo_type = logo.mimetype
+        profile.has_logo = True
+    return None
+
+
+@app.route('/colleges')
+def list_colleges():
+    """Stored college profiles, for selecting one in jain_data.college_id"""
+    ensure_schema()
+    with read_session() as session:
+        profiles = session.query(CollegeProfile).order_by(CollegeProfile.name).all()
+        return jsonify([p.to_dict() for p in profiles])
+
+
+@app.route('/colleges', methods=['POST'])
+@app.route('/colleges/<int:college_id>', methods=['PUT'])
+def save_college(college_id=None):
+    """Create or update a college profile (admin only, multipart form)"""
+    from flask import session
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Admin login required'}), 401
 
-def render_blocks(slide, blocks):
-    """Enhanced block renderer supporting multiple content types"""
-    # Check if we have a text placeholder
-    has_text_placeholder = len(slide.placeholders) > 1
-    
-    if has_text_placeholder:
-        tf = slide.shapes.placeholders[1].text_frame
-        tf.clear()
+    ensure_schema()
+    if college_id is None:
+        profile = CollegeProfile()
     else:
-        tf = None
-    
-    current_top = 2.5  # Starting position for non-text elements
-    
-    for block in blocks:
-        kind = block.get("kind", "")
-        
-        # Text-based blocks (use placeholder text frame)
-        if kind == "heading" and tf:
-            render_heading(tf, block)
-            
-        elif kind == "paragraph" and tf:
-            render_paragraph(tf, block)
-            
-        elif kind == "bullets" and tf:
-            render_bullets(tf, block)
-            
-        elif kind == "numbered_list" and tf:
-            render_numbered_list(tf, block)
-        
-        # Positioned blocks (custom positioning)
-        elif kind == "table":
-            render_table(slide, block, current_top)
-            current_top += block.get("height", 2) + 0.3
-            
-        elif kind == "text_box":
-            render_text_box(slide, block)
-            
-        elif kind == "images":
-            render_images(slide, block, current_top)
-            # Calculate height used by images
-            if block.get("layout") == "column":
-                current_top += block.get("height", 4)
-            else:
-                current_top += 2.5
-        
-        # Legacy support for old "paragraph" without explicit kind
-        elif "text" in block and kind == "" and tf:
-            add_text(tf, block["text"])
+        profile = db.session.get(CollegeProfile, college_id)
+        if profile is None:
+            return jsonify({'error': 'College profile not found'}), 404
+
+    error = _apply_college_form(profile)
+    if error:
+        return jsonify({'error': error}), 400
+    duplicate = CollegeProfile.query.filter(CollegeProfile.name == profile.name,
+                                            CollegeProfile.id != profile.id).first()
+    if duplicate:
+        return jsonify({'error': f"A profile named '{profile.name}' already exists"}), 409
+
+    db.session.add(profile)
+    db.session.commit()
+    if suggest_index.built_at is not None:
+        suggest_index.record({'college': profile.name}, count=0)
+    return jsonify(profile.to_dict()), 201 if college_id is None else 200
+
+
+@app.route('/colleges/<int:college_id>/logo')
+def college_logo(college_id):
+    ensure_schema()
+    profile = db.session.get(CollegeProfile, college_id)
+    if profile is None or not profile.has_logo:
+        return jsonify({'error': 'Logo not found'}), 404
+    from io import BytesIO
+    return send_file(BytesIO(profile.logo), mimetype=profile.logo_type, max_age=3600)
+
+
+def template_geometry(template_meta):
+    """(slide height, body width, body height) in inches that a template paginates with"""
+    from pagination import BODY_HEIGHT, BODY_WIDTH
+    body = template_meta.get('body') or {}
+    return (template_meta.get('slide_height', 7.5), body.get('width', BODY_WIDTH), body.get('height', BODY_HEIGHT))
+
+
+@app.route('/preview', methods=['POST'])
+def preview():
+    """SVG thumbnails of every slide, without building the .pptx"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        content = data.get('json_data', data)
+        if isinstance(content, str):
+            content = json.loads(content)
+    except ValueError:
+        return jsonify({'error': 'Invalid JSON format'}), 400
+
+    if not (isinstance(content, dict) and isinstance(content.get('meta'), dict)
+            and isinstance(content.get('slides'), list)):
+        return jsonify({'error': 'Invalid JSON structure. Required: meta and slides'}), 400
+
+    only, known = data.get('only'), data.get('known')
+    if only is not None and not (isinstance(only, list) and all(isinstance(s, (int, str)) for s in only)):
+        return jsonify({'error': 'only must be a list of slide indexes or "title"'}), 400
+    if known is not None and not (isinstance(known, dict) and all(isinstance(h, str) for h in known.values())):
+        return jsonify({'error': 'known must map page indexes to hashes'}), 400
+
+    # Paginate with the template's slide and body size, as the .pptx would
+    geometry = None
+    if content['meta'].get('template'):
+        from theme_templates import load_metadata
+        try:
+            template_meta = load_metadata(content['meta']['template'])
+        except ValueError:
+            template_meta = None
+        if template_meta is None:
+            return jsonify({'error': 'Unknown template id'}), 400
+        geometry = template_geometry(template_meta)
+
+    from preview import preview_deck, preview_html
+
+    jain_data, _ = resolve_college(data.get('jain_data'))
+    try:
+        result = preview_deck(content, jain_data, only=only, known=known, geometry=geometry)
+    except Exception as e:
+        # Half-typed decks are the normal case while editing
+        return jsonify({'error': f'Cannot preview this deck: {type(e).__name__}: {e}'}), 400
+    if data.get('format') == 'html' or request.args.get('format') == 'html':
+        return preview_html(result)
+    return jsonify(result)
+
+
+@app.route('/templates', methods=['POST'])
+def upload_template():
+    """Store an uploaded .pptx theme template and return its id and layouts"""
+    from theme_templates import store_template
+
+    # Uploads draw from their own per-client bucket, separate from rendering
+    ticket = admission.charge('templates:' + admission.client_key(request.headers.get('X-Forwarded-For'),
+                                                                  request.remote_addr))
+    if not ticket.admitted:
+        return jsonify({'error': ticket.reason}), ticket.status, {'Retry-After': str(ticket.retry_after)}
+
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'No template file uploaded (form field "file")'}), 400
+    try:
+        meta = store_template(upload.read(), os.path.splitext(secure_filename(upload.filename or ''))[0] or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(meta), 201
 
 
-def create_college_title_slide(prs, college_data):
-    """Create custom college/university title slide"""
-    # Use blank layout for custom design
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank layout
+@app.route('/templates/<template_id>')
+def template_info(template_id):
+    from theme_templates import load_metadata
+
+    try:
+        meta = load_metadata(template_id)
+    except ValueError:
+        meta = None
+    if meta is None:
+        return jsonify({'error': 'Template not found'}), 404
+    return jsonify(meta)
+
+
+def render_deck(generation, output_path, content, jain_data, college, output_profile, stream, optimize, start_time):
+    """Render and save a deck, filling in the generation record; returns the peak memory growth"""
+    # Rendering modules are imported on first use
+    from renderer import build_presentation
+    from save_engine import StreamingPackageWriter, save_presentation
     
-    # Add college logo at top center (if exists)
-    logo_path = 'static/college.png'
-    if os.path.exists(logo_path):
-        left = Inches(3.5)  # Center position
-        top = Inches(0.5)
-        height = Inches(1.2)
-        slide.shapes.add_picture(logo_path, left, top, height=height)
+    from optimizer import InheritedStyles, new_report, optimize_presentation, strip_run_properties
     
-    # Add college/university name
-    uni_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(0.5))
-    uni_tf = uni_box.text_frame
-    uni_tf.text = college_data.get('college_name', 'College/University Name')
-    uni_p = uni_tf.paragraphs[0]
-    uni_p.alignment = PP_ALIGN.CENTER
-    uni_p.font.size = Pt(24)
-    uni_p.font.bold = True
-    uni_p.font.color.rgb = RGBColor(0, 0, 128)
+    report = new_report() if optimize else None
+    run_styles = InheritedStyles() if optimize else None
+    render_begin = time.perf_counter()
+    with PeakMemoryMonitor() as memory:
+        if stream:
+            # Each slide goes into the archive as soon as it is rendered
+            with StreamingPackageWriter(output_path, output_profile) as writer:
+                def write_slide(slide):
+                    if optimize:
+                        strip_run_properties(slide, report, run_styles)
+                    writer.write_slide(slide)
+                
+                prs = build_presentation(content, jain_data, on_slide=write_slide, college=college)
+                if optimize:
+                    optimize_presentation(prs, report, streamed=True)
+                writer.finish(prs)
+        else:
+            prs = build_presentation(content, jain_data, college=college)
+            if optimize:
+                optimize_presentation(prs, report)
+            save_presentation(prs, output_path, output_profile)
     
-    # Add presentation title
-    title_box = slide.shapes.add_textbox(Inches(1), Inches(2.7), Inches(8), Inches(0.8))
-    title_tf = title_box.text_frame
-    title_tf.text = college_data.get('title', 'Presentation Title')
-    title_tf.word_wrap = True
-    title_p = title_tf.paragraphs[0]
-    title_p.alignment = PP_ALIGN.CENTER
-    title_p.font.size = Pt(32)
-    title_p.font.bold = True
-    title_p.font.color.rgb = RGBColor(0, 0, 0)
+    generation.actual_cost = admission.actual_cost(time.perf_counter() - render_begin)
+    if report:
+        generation.bytes_saved = report['bytes_saved']
+    generation.peak_memory = memory.peak_delta
+    generation.output_mode = 'stream' if stream else 'buffered'
+    generation.status = 'success'
+    generation.file_size = os.path.getsize(output_path)
+    generation.generation_time = time.time() - start_time
+    return memory.peak_delta
+
+
+def generation_done(generation, output_path):
+    """Bookkeeping after a generation has been committed as successful"""
+    # Make the new names available to autocomplete right away
+    if suggest_index.built_at is not None:
+        suggest_index.record(generation_values(generation))
     
-    # Check if single or group
-    if college_data.get('type') == 'single':
-        # Single student details
-        details_top = 3.8
-        details_box = slide.shapes.add_textbox(Inches(2), Inches(details_top), Inches(6), Inches(2.5))
-        details_tf = details_box.text_frame
-        details_tf.word_wrap = True
-        
-        # Submitted by
-        p = details_tf.paragraphs[0]
-        p.text = "Submitted By:"
-        p.font.size = Pt(16)
-        p.font.bold = True
-        p.alignment = PP_ALIGN.CENTER
-        
-        # Student details
-        student_info = [
-            f"Name: {college_data.get('student_name', '')}",
-            f"USN: {college_data.get('usn', '')}",
-            f"Course: {college_data.get('course', '')}",
-            f"Semester: {college_data.get('semester', '')}"
-        ]
-        
-        for info in student_info:
-            p = details_tf.add_paragraph()
-            p.text = info
-            p.font.size = Pt(14)
-            p.alignment = PP_ALIGN.CENTER
-            p.space_before = Pt(6)
-        
-        # Submitted to
-        p = details_tf.add_paragraph()
-        p.text = f"\nSubmitted To: {college_data.get('professor', '')}"
-        p.font.size = Pt(14)
-        p.font.bold = True
-        p.alignment = PP_ALIGN.CENTER
-        p.space_before = Pt(12)
-        
-    elif college_data.get('type') == 'group':
-        # Group - create table for students
-        students = college_data.get('students', [])
-        
-        # Add "Submitted By:" text
-        sub_box = slide.shapes.add_textbox(Inches(2), Inches(3.7), Inches(6), Inches(0.4))
-        sub_tf = sub_box.text_frame
-        sub_p = sub_tf.paragraphs[0]
-        sub_p.text = "Submitted By:"
-        sub_p.font.size = Pt(16)
-        sub_p.font.bold = True
-        sub_p.alignment = PP_ALIGN.CENTER
-        
-        # Create table
-        if students:
-            rows = len(students) + 1  # +1 for header
-            cols = 2
-            left = Inches(2.5)
-            top = Inches(4.2)
-            width = Inches(5)
-            height = Inches(0.4 * rows)
-            
-            table = slide.shapes.add_table(rows, cols, left, top, width, height).table
-            
-            # Set column widths
-            table.columns[0].width = Inches(2.5)
-            table.columns[1].width = Inches(2.5)
-            
-            # Header row
-            table.cell(0, 0).text = "Name"
-            table.cell(0, 1).text = "USN"
-            
-            for i, cell in enumerate([table.cell(0, 0), table.cell(0, 1)]):
-                cell.text_frame.paragraphs[0].font.bold = True
-                cell.text_frame.paragraphs[0].font.size = Pt(12)
-                cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-                cell.fill.solid()
-                cell.fill.fore_color.rgb = RGBColor(200, 200, 200)
-            
-            # Data rows
-            for idx, student in enumerate(students):
-                table.cell(idx + 1, 0).text = student.get('name', '')
-                table.cell(idx + 1, 1).text = student.get('usn', '')
-                
-                for col in range(2):
-                    cell = table.cell(idx + 1, col)
-                    cell.text_frame.paragraphs[0].font.size = Pt(11)
-                    cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-        
-        # Submitted to
-        prof_box = slide.shapes.add_textbox(Inches(2), Inches(6.5), Inches(6), Inches(0.4))
-        prof_tf = prof_box.text_frame
-        prof_p = prof_tf.paragraphs[0]
-        prof_p.text = f"Submitted To: {college_data.get('professor', '')}"
-        prof_p.font.size = Pt(14)
-        prof_p.font.bold = True
-        prof_p.alignment = PP_ALIGN.CENTER
+    print(f"✅ PPT generated: {output_path} (tracked in DB, {generation.output_mode}, "
+          f"peak memory +{generation.peak_memory / (1024 * 1024):.1f} MB, {generation.lane} lane, "
+          f"cost {generation.estimated_cost:g} est / {generation.actual_cost:g} actual)")
+
+
+def run_heavy_job(job_id, ticket, generation_id, render_args):
+    """Render a heavy-lane deck in the background and record the outcome for /jobs/<id>"""
+    output_path, _ = jobs.paths(job_id)
+    with app.app_context():
+        generation = db.session.get(Generation, generation_id)
+        try:
+            peak_memory = render_deck(generation, output_path, **render_args)
+            db.session.commit()
+            generation_done(generation, output_path)
+            jobs.write_status(job_id, 'success', peak_memory=peak_memory)
+        except Exception as e:
+            db.session.rollback()
+            error = f'Missing required field: {str(e)}' if isinstance(e, KeyError) else str(e)
+            generation = db.session.get(Generation, generation_id)
+            generation.status = 'failed'
+            generation.error_message = error
+            generation.generation_time = time.time() - render_args['start_time']
+            db.session.commit()
+            print(f"Error generating PPT: {error}")
+            jobs.write_status(job_id, 'failed', error=error)
+        finally:
+            admission.release(ticket)
+
+
+@app.route('/jobs/<job_id>')
+def job_result(job_id):
+    """Status of a heavy-lane job, or its .pptx once it is done"""
+    try:
+        job = jobs.read_status(job_id)
+    except ValueError:
+        job = None
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job['status'] == 'running':
+        return jsonify({'job_id': job_id, 'status': 'running'}), 202, {'Retry-After': str(jobs.POLL_SECONDS)}
+    if job['status'] == 'failed':
+        return jsonify({'job_id': job_id, 'status': 'failed', 'error': job.get('error')}), 500
+    output_path, _ = jobs.paths(job_id)
+    response = send_file(output_path,
+                         as_attachment=True,
+                         download_name=job.get('download_name', 'presentation.pptx'),
+                         mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation')
+    response.headers['X-Peak-Memory'] = str(job.get('peak_memory', 0))
+    return response
 
 
 @app.route('/generate_ppt', methods=['POST'])
 def generate_ppt():
     start_time = time.time()
     generation = None
+    ticket = None
     
     try:
         # Get JSON data from request or use default content.json
@@ -578,27 +618,62 @@ def generate_ppt():
                 content = json.loads(data['json_data'])
                 file_name = data.get('file_name', 'presentation')
                 jain_data = data.get('jain_data')  # Get college/university data if provided
+                output_profile = data.get('output_profile', DEFAULT_SAVE_PROFILE)
+                stream = data.get('stream')
+                optimize = data.get('optimize', OPTIMIZE_DEFAULT)
             else:
                 content = data
                 file_name = 'presentation'
                 jain_data = None
+                output_profile = DEFAULT_SAVE_PROFILE
+                stream = None
+                optimize = OPTIMIZE_DEFAULT
         else:
             # Fallback to content.json file
             with open('content.json', 'r', encoding='utf-8') as f:
                 content = json.load(f)
             file_name = 'Generated'
             jain_data = None
+            output_profile = DEFAULT_SAVE_PROFILE
+            stream = None
+            optimize = OPTIMIZE_DEFAULT
         
         # Validate required fields
         if 'meta' not in content or 'slides' not in content:
             return jsonify({'error': 'Invalid JSON structure. Required: meta and slides'}), 400
         
+        if output_profile not in SAVE_PROFILES:
+            return jsonify({'error': f"Invalid output_profile. Use one of: {', '.join(SAVE_PROFILES)}"}), 400
+        
+        if content['meta'].get('template'):
+            from theme_templates import load_metadata
+            try:
+                template_meta = load_metadata(content['meta']['template'])
+            except ValueError:
+                template_meta = None
+            if template_meta is None:
+                return jsonify({'error': 'Unknown template id'}), 400
+        
+        # Admission control: per-client rate limit and global capacity by estimated cost
+        ticket = admission.admit(admission.client_key(request.headers.get('X-Forwarded-For'), request.remote_addr),
+                                 admission.estimate_cost(content))
+        if not ticket.admitted:
+            return (jsonify({'error': ticket.reason}), ticket.status,
+                    {'Retry-After': str(ticket.retry_after)})
+        
         # Analyze content for tracking
         num_slides = len([s for s in content.get('slides', []) if s.get('type') != 'title'])
         has_tables = any('table' in str(s.get('blocks', [])).lower() for s in content.get('slides', []))
         has_images = any('image' in str(s.get('blocks', [])).lower() for s in content.get('slides', []))
         has_charts = any('chart' in str(s.get('blocks', [])).lower() for s in content.get('slides', []))
         
+        ensure_schema()
+        
+        # Stored college profile referenced by jain_data.college_id
+        jain_data, college_profile = resolve_college(jain_data)
+        if jain_data and jain_data.get('enabled') and jain_data.get('college_id') and college_profile is None:
+            return jsonify({'error': 'Unknown college_id'}), 400
+        
         # Create generation record
         generation = Generation(
             file_name=file_name,
@@ -610,6 +685,8 @@ def generate_ppt():
             has_tables=has_tables,
             has_images=has_images,
             has_charts=has_charts,
+            lane=ticket.lane,
+            estimated_cost=ticket.cost,
             status='processing'
         )
         
@@ -643,57 +720,42 @@ def generate_ppt():
                     )
                     db.session.add(student)
         
-        # Create presentation
-        prs = Presentation()
-
-        # Add college title slide if requested
-        if jain_data and jain_data.get('enabled'):
-            create_college_title_slide(prs, jain_data)
-        else:
-            # Standard title slide
-            slide = prs.slides.add_slide(prs.slide_layouts[0])
-            slide.shapes.title.text = content["meta"].get("title", "Presentation")
-            if len(slide.placeholders) > 1:
-                slide.placeholders[1].text = content["meta"].get("subtitle", "")
-
-        # Content slides
-        for s in content["slides"]:
-            if s.get("type") == "title":
-                continue
-
-            slide = prs.slides.add_slide(prs.slide_layouts[1])
-            slide.shapes.title.text = s.get("title", "Slide")
-
-            if "subtitle" in s:
-                p = slide.shapes.title.text_frame.add_paragraph()
-                p.text = s["subtitle"]
-                p.level = 1
-
-            render_blocks(slide, s.get("blocks", []))
-
-            if "notes" in s:
-                slide.notes_slide.notes_text_frame.text = s["notes"]
-
         # Save to temp directory (writable on serverless platforms like Vercel)
         temp_dir = tempfile.gettempdir()
         output_filename = f"{secure_filename(file_name)}.pptx"
         output_path = os.path.join(temp_dir, output_filename)
         
-        prs.save(output_path)
+        if stream is None:
+            stream = len(content["slides"]) >= STREAM_SLIDE_THRESHOLD
         
-        # Update generation record with success info
-        generation.status = 'success'
-        generation.file_size = os.path.getsize(output_path)
-        generation.generation_time = time.time() - start_time
-        db.session.commit()
+        college = None
+        if college_profile is not None:
+            from college_profiles import title_fragment
+            college = title_fragment(college_profile)
         
-        print(f"✅ PPT generated: {output_path} (tracked in DB)")
+        render_args = dict(content=content, jain_data=jain_data, college=college, output_profile=output_profile,
+                           stream=stream, optimize=optimize, start_time=start_time)
+        if ticket.lane == admission.HEAVY_LANE:
+            # Large decks render on the heavy-lane pool; the client polls /jobs/<id>
+            db.session.commit()
+            job_id = jobs.create(generation_id=generation.id, download_name=output_filename)
+            jobs.executor().submit(run_heavy_job, job_id, ticket, generation.id, render_args)
+            ticket = None  # released by the job when it finishes
+            status_url = url_for('job_result', job_id=job_id)
+            return (jsonify({'job_id': job_id, 'status': 'running', 'status_url': status_url}), 202,
+                    {'Location': status_url, 'Retry-After': str(jobs.POLL_SECONDS)})
+        
+        peak_memory = render_deck(generation, output_path, **render_args)
+        db.session.commit()
+        generation_done(generation, output_path)
         
         # Send file and let Flask clean up after response
-        return send_file(output_path, 
+        response = send_file(output_path, 
                         as_attachment=True, 
                         download_name=output_filename,
                         mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation')
+        response.headers['X-Peak-Memory'] = str(peak_memory)
+        return response
     except json.JSONDecodeError as e:
         if generation:
             generation.status = 'failed'
@@ -716,6 +778,8 @@ def generate_ppt():
             db.session.commit()
         print(f"Error generating PPT: {str(e)}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        admission.release(ticket)
 
 if __name__ == '__main__':
     # Development server only
@@ -0,0 +1,60 @@
+import os
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SAMPLE_INTERVAL = float(os.getenv('PPT_MEMORY_SAMPLE_INTERVAL', 0.01))  # seconds
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # No procfs (macOS/Windows): fall back to the lifetime peak
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakMemoryMonitor:
+    """Track the peak process RSS while a block of code runs
+
+    A daemon thread samples RSS every SAMPLE_INTERVAL seconds. With one
+    request per gunicorn worker the peak is attributable to that request.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        self._thread = threading.Thread(target=self._sample, name='rss-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    @property
+    def peak_delta(self):
+        """Growth of RSS above the starting point, in bytes"""
+        return max(0, self.peak_rss - self.start_rss)
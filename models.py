@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, timedelta
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func
+from sqlalchemy import func, inspect, text
 
 db = SQLAlchemy()
 
@@ -26,9 +26,10 @@ class Generation(db.Model):
     subtitle = db.Column(db.String(500))
     num_slides = db.Column(db.Integer)
     file_size = db.Column(db.Integer)  # in bytes
+    bytes_saved = db.Column(db.Integer)  # saved by the optimizer pass, in bytes
     
     # College/Academic information (optional)
-    college_name = db.Column(db.String(255))
+    college_name = db.Column(db.String(255), index=True)
     presentation_title = db.Column(db.String(500))
     student_type = db.Column(db.String(20))  # 'single' or 'group'
     course = db.Column(db.String(100))
@@ -39,6 +40,11 @@ class Generation(db.Model):
     ip_address = db.Column(db.String(50))
     user_agent = db.Column(db.String(500))
     generation_time = db.Column(db.Float)  # Time taken to generate in seconds
+    peak_memory = db.Column(db.Integer)  # Peak RSS growth while rendering, in bytes
+    output_mode = db.Column(db.String(20))  # buffered/stream
+    lane = db.Column(db.String(10))  # fast/heavy scheduling lane
+    estimated_cost = db.Column(db.Float)  # admission.estimate_cost() before rendering
+    actual_cost = db.Column(db.Float)  # render time in the same cost units
     status = db.Column(db.String(20), default='success')  # success/failed
     error_message = db.Column(db.Text)
     
@@ -86,20 +92,83 @@ class DailyStats(db.Model):
         return f'<DailyStats {self.date}: {self.total_generations} generations>'
 
 
-def get_analytics_summary():
-    """Get comprehensive analytics summary"""
-    total_generations = Generation.query.count()
-    successful_generations = Generation.query.filter_by(status='success').count()
-    failed_generations = Generation.query.filter_by(status='failed').count()
+COLLEGE_LAYOUTS = ('centered', 'left')
+
+
+class CollegeProfile(db.Model):
+    """Stored college branding that jain_data can reference by college_id"""
+    __tablename__ = 'college_profiles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False, unique=True, index=True)
+
+    # Logo image, loaded only when the title slide fragment is (re)built
+    logo = db.deferred(db.Column(db.LargeBinary))
+    has_logo = db.Column(db.Boolean, default=False)
+    logo_type = db.Column(db.String(50))  # MIME type of the logo
+
+    # Colors as '#RRGGBB' and the title slide layout ('centered' or 'left')
+    name_color = db.Column(db.String(20), default='#000080')
+    title_color = db.Column(db.String(20), default='#000000')
+    header_color = db.Column(db.String(20), default='#C8C8C8')
+    layout = db.Column(db.String(20), default='centered')
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'has_logo': bool(self.has_logo),
+            'name_color': self.name_color,
+            'title_color': self.title_color,
+            'header_color': self.header_color,
+            'layout': self.layout,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<CollegeProfile {self.id}: {self.name}>'
+
+
+def upgrade_schema():
+    """Create missing tables, columns and indexes
+
+    db.create_all() only creates tables that do not exist yet, so columns
+    added to an existing model are applied here with ALTER TABLE.
+    """
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def get_analytics_summary(session=None):
+    """Get comprehensive analytics summary
+
+    Pass a read-only session to keep dashboard queries off the write engine.
+    """
+    session = session or db.session
+    total_generations = session.query(Generation).count()
+    successful_generations = session.query(Generation).filter_by(status='success').count()
+    failed_generations = session.query(Generation).filter_by(status='failed').count()
     
     # Total students tracked
-    total_students = Student.query.count()
+    total_students = session.query(Student).count()
     
     # Average slides per generation
-    avg_slides = db.session.query(func.avg(Generation.num_slides)).scalar() or 0
+    avg_slides = session.query(func.avg(Generation.num_slides)).scalar() or 0
     
     # Most active colleges
-    top_colleges = db.session.query(
+    top_colleges = session.query(
         Generation.college_name,
         func.count(Generation.id).label('count')
     ).filter(
@@ -111,14 +180,14 @@ def get_analytics_summary():
     ).limit(10).all()
     
     # Recent generations
-    recent_generations = Generation.query.order_by(
+    recent_generations = session.query(Generation).order_by(
         Generation.timestamp.desc()
     ).limit(10).all()
     
     # Generations by date (last 30 days)
     from datetime import timedelta
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    daily_counts = db.session.query(
+    daily_counts = session.query(
         func.date(Generation.timestamp).label('date'),
         func.count(Generation.id).label('count')
     ).filter(
@@ -0,0 +1,235 @@
+import zlib
+from hashlib import sha256
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import ImagePart
+from pptx.parts.media import MediaPart
+from pptx.parts.slide import SlidePart
+
+NS = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+}
+
+# Run attributes whose value equals the OOXML default when nothing above the
+# run in the inheritance chain sets them
+DEFAULT_RUN_ATTRS = {'b': '0', 'i': '0', 'u': 'none'}
+
+TITLE_TYPES = ('title', 'ctrTitle')
+
+# Local header + central directory record for one archive member (approximate)
+ZIP_ENTRY_OVERHEAD = 120
+
+
+def new_report():
+    """Empty optimization report"""
+    return {'layouts_removed': 0, 'masters_removed': 0, 'media_deduplicated': 0,
+            'run_attrs_stripped': 0, 'bytes_saved': 0}
+
+
+def _deflated_size(blob):
+    """Approximate bytes a blob occupies in the archive"""
+    return len(zlib.compress(blob, 6)) + ZIP_ENTRY_OVERHEAD
+
+
+def _reachable_parts(prs):
+    """Every part reachable from the package root"""
+    package = prs.part.package
+    seen = set()
+    stack = [rel.target_part for rel in package._rels.values() if not rel.is_external]
+    while stack:
+        part = stack.pop()
+        if part in seen:
+            continue
+        seen.add(part)
+        stack.extend(rel.target_part for rel in part.rels.values() if not rel.is_external)
+    return seen
+
+
+def _part_bytes(part):
+    size = _deflated_size(part.blob)
+    if part._rels:
+        size += _deflated_size(part.rels.xml)
+    return size
+
+
+def remove_unused_layouts(prs, report):
+    """Drop slide layouts no slide uses, and masters left without used layouts"""
+    used_layouts = set()
+    for part in prs.part.package.iter_parts():
+        if isinstance(part, SlidePart):
+            used_layouts.add(part.part_related_by(RT.SLIDE_LAYOUT))
+
+    # Layouts to drop, as (master part, sldLayoutId element) pairs
+    dropped = []
+    unused_masters = []
+    for master in prs.slide_masters:
+        master_part = master.part
+        entries = list(master._element.sldLayoutIdLst.sldLayoutId_lst)
+        unused = [e for e in entries if master_part.related_part(e.rId) not in used_layouts]
+        if len(unused) == len(entries):
+            unused_masters.append(master)
+        else:
+            dropped.extend((master_part, e) for e in unused)
+
+    # Keep at least one master so the package stays valid
+    if len(unused_masters) == len(prs.slide_masters):
+        keep = unused_masters.pop(0)
+        entries = list(keep._element.sldLayoutIdLst.sldLayoutId_lst)
+        dropped.extend((keep.part, e) for e in entries[1:])
+
+    before = _reachable_parts(prs)
+    for master_part, entry in dropped:
+        master_part._element.sldLayoutIdLst.remove(entry)
+        master_part.drop_rel(entry.rId)
+        report['layouts_removed'] += 1
+
+    sldMasterIdLst = prs.part._element.sldMasterIdLst
+    for master in unused_masters:
+        for entry in list(sldMasterIdLst.sldMasterId_lst):
+            if prs.part.related_part(entry.rId) is master.part:
+                report['layouts_removed'] += len(master._element.sldLayoutIdLst.sldLayoutId_lst)
+                sldMasterIdLst.remove(entry)
+                prs.part.drop_rel(entry.rId)
+                report['masters_removed'] += 1
+
+    after = _reachable_parts(prs)
+    report['bytes_saved'] += sum(_part_bytes(part) for part in before - after)
+
+
+def dedupe_media(prs, report):
+    """Point every relationship at a single copy of identical images and media"""
+    canonical = {}
+    duplicates = {}
+    for part in prs.part.package.iter_parts():
+        if isinstance(part, (ImagePart, MediaPart)):
+            digest = (part.content_type, sha256(part.blob).hexdigest())
+            if digest in canonical:
+                duplicates[part] = canonical[digest]
+            else:
+                canonical[digest] = part
+    if not duplicates:
+        return
+
+    for part in list(prs.part.package.iter_parts()):
+        for rel in part.rels.values():
+            if not rel.is_external and rel._target in duplicates:
+                rel._target = duplicates[rel._target]
+
+    for duplicate in duplicates:
+        report['media_deduplicated'] += 1
+        report['bytes_saved'] += len(duplicate.blob) + ZIP_ENTRY_OVERHEAD
+
+
+class InheritedStyles:
+    """Resolves which run properties a placeholder inherits from layout, master and theme"""
+
+    def __init__(self):
+        self._cache = {}
+        self._theme_fonts = {}
+
+    def _theme_font(self, master_part, kind):
+        key = (master_part.partname, kind)
+        if key not in self._theme_fonts:
+            typeface = None
+            theme_part = master_part.part_related_by(RT.THEME)
+            theme = etree.fromstring(theme_part.blob)
+            node = theme.find(f'.//a:fontScheme/a:{kind}Font/a:latin', NS)
+            if node is not None:
+                typeface = node.get('typeface')
+            self._theme_fonts[key] = typeface
+        return self._theme_fonts[key]
+
+    @staticmethod
+    def _find_placeholder(element, ph_type, ph_idx):
+        for ph in element.iterfind('.//p:sp/p:nvSpPr/p:nvPr/p:ph', NS):
+            if ph_type in TITLE_TYPES:
+                if ph.get('type') in TITLE_TYPES:
+                    return ph.getparent().getparent().getparent()
+            elif ph.get('idx', '0') == ph_idx and ph.get('type') not in TITLE_TYPES:
+                return ph.getparent().getparent().getparent()
+        return None
+
+    def resolve(self, slide_part, ph, level):
+        """Return (attributes set by ancestors, inherited latin typeface)"""
+        layout_part = slide_part.part_related_by(RT.SLIDE_LAYOUT)
+        ph_type, ph_idx = ph.get('type', 'body'), ph.get('idx', '0')
+        key = (layout_part.partname, ph_type in TITLE_TYPES, ph_idx, level)
+        if key in self._cache:
+            return self._cache[key]
+
+        master_part = layout_part.part_related_by(RT.SLIDE_MASTER)
+        lvl = f'a:lvl{level + 1}pPr'
+        sources = []
+        for element in (layout_part._element, master_part._element):
+            sp = self._find_placeholder(element, ph_type, ph_idx)
+            if sp is not None:
+                sources.append(sp.find(f'p:txBody/a:lstStyle/{lvl}/a:defRPr', NS))
+        style = 'p:titleStyle' if ph_type in TITLE_TYPES else 'p:bodyStyle'
+        sources.append(master_part._element.find(f'p:txStyles/{style}/{lvl}/a:defRPr', NS))
+
+        attrs = set()
+        latin = None
+        for defRPr in sources:
+            if defRPr is None:
+                continue
+            attrs.update(defRPr.attrib)
+            node = defRPr.find('a:latin', NS)
+            if latin is None and node is not None:
+                latin = node.get('typeface')
+        if latin in ('+mn-lt', '+mj-lt'):
+            latin = self._theme_font(master_part, 'minor' if latin == '+mn-lt' else 'major')
+
+        self._cache[key] = (attrs, latin)
+        return attrs, latin
+
+
+def strip_run_properties(slide, report, styles=None):
+    """Remove run properties in placeholders that only restate inherited values"""
+    styles = styles or InheritedStyles()
+    removed = []
+    for sp in slide._element.iterfind('.//p:sp', NS):
+        ph = sp.find('p:nvSpPr/p:nvPr/p:ph', NS)
+        if ph is None:
+            continue
+        for p in sp.iterfind('p:txBody/a:p', NS):
+            pPr = p.find('a:pPr', NS)
+            level = int(pPr.get('lvl', 0)) if pPr is not None else 0
+            inherited_attrs, inherited_latin = styles.resolve(slide.part, ph, level)
+            for rPr in p.iterfind('a:r/a:rPr', NS):
+                for attr, default in DEFAULT_RUN_ATTRS.items():
+                    if rPr.get(attr) == default and attr not in inherited_attrs:
+                        removed.append(f' {attr}="{default}"')
+                        del rPr.attrib[attr]
+                latin = rPr.find('a:latin', NS)
+                if latin is not None and inherited_latin and latin.get('typeface') == inherited_latin \
+                        and len(latin.attrib) == 1:
+                    removed.append(etree.tostring(latin).decode())
+                    rPr.remove(latin)
+        for rPr in sp.iterfind('p:txBody/a:p/a:r/a:rPr', NS):
+            if not len(rPr) and not rPr.attrib:
+                removed.append('<a:rPr/>')
+                rPr.getparent().remove(rPr)
+    if removed:
+        report['run_attrs_stripped'] += len(removed)
+        report['bytes_saved'] += len(zlib.compress(''.join(removed).encode(), 6))
+    return styles
+
+
+def optimize_presentation(prs, report=None, streamed=False):
+    """Run every optimization on a rendered deck and return the report
+
+    With streamed=True the slides are already in the archive: their run
+    properties were stripped per slide before writing, and media cannot be
+    re-pointed, so only unused layouts and masters are removed.
+    """
+    report = report or new_report()
+    if not streamed:
+        styles = InheritedStyles()
+        for slide in prs.slides:
+            strip_run_properties(slide, report, styles)
+    remove_unused_layouts(prs, report)
+    if not streamed:
+        dedupe_media(prs, report)
+    return report
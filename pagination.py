@@ -0,0 +1,214 @@
+import math
+from functools import lru_cache
+
+# Default python-pptx template geometry (inches)
+SLIDE_HEIGHT = 7.5
+BODY_WIDTH = 9.0
+BODY_HEIGHT = 4.95
+TABLE_TOP = 2.5
+BOTTOM_MARGIN = 0.3
+
+LINE_SPACING = 1.2       # line height as a multiple of the font size
+CHAR_WIDTH = 0.5         # average glyph width as a multiple of the font size
+LEVEL_INDENT = 0.5       # indent per bullet level (inches)
+CELL_PADDING = 0.2       # horizontal + vertical padding inside a table cell (inches)
+MIN_ROW_HEIGHT = 0.4
+
+CONTINUED_SUFFIX = " (cont.)"
+
+HEADING_SIZES = {1: 28, 2: 24, 3: 20}
+
+
+@lru_cache(maxsize=8192)
+def estimate_lines(text, size, width):
+    """Estimate how many wrapped lines `text` takes at `size` pt in `width` inches"""
+    chars_per_line = max(1, int(width * 72 / (size * CHAR_WIDTH)))
+    return sum(max(1, math.ceil(len(segment) / chars_per_line)) for segment in text.split("\n"))
+
+
+def text_height(text, size, width):
+    """Estimated height in inches of wrapped `text`"""
+    return estimate_lines(text, size, width) * size * LINE_SPACING / 72
+
+
+def _item_text(item):
+    return item if isinstance(item, str) else str(item.get("text", ""))
+
+
+def bullet_item_height(item, width, size=18):
+    """Height of one bullet item including its sub-points"""
+    height = text_height(_item_text(item), size, width)
+    if isinstance(item, dict):
+        for sub in item.get("subpoints", []):
+            height += text_height(_item_text(sub), size, width - LEVEL_INDENT)
+    return height
+
+
+def numbered_item_height(item, number, width, size=18):
+    return text_height(f"{number}. {_item_text(item)}", size, width)
+
+
+def text_block_height(block, width):
+    """Height of a heading/paragraph/legacy text block in the body placeholder"""
+    if block.get("kind") == "heading":
+        size = HEADING_SIZES.get(block.get("level", 1), 24)
+    else:
+        size = block.get("size", 18)
+    return text_height(str(block.get("text", "")), size, width)
+
+
+def positioned_block_height(block):
+    """Vertical space render_blocks reserves for a positioned block"""
+    kind = block.get("kind", "")
+    if kind == "table":
+        return block.get("height", 2) + 0.3
+    if kind == "chart":
+        return block.get("height", 4.5) + 0.3
+    if kind == "images":
+        return block.get("height", 4) if block.get("layout") == "column" else 2.5
+    return 0
+
+
+def table_row_height(row, col_widths, font_size):
+    """Estimated height of one table row from its tallest cell"""
+    lines = 1
+    for cell, col_width in zip(row, col_widths):
+        text = str(cell.get("text", "")) if isinstance(cell, dict) else str(cell)
+        lines = max(lines, estimate_lines(text, font_size, max(0.1, col_width - CELL_PADDING)))
+    return max(MIN_ROW_HEIGHT, lines * font_size * LINE_SPACING / 72 + CELL_PADDING)
+
+
+class _Paginator:
+    """Packs the blocks of one slide into as many pages as needed"""
+
+    def __init__(self, slide, slide_height, body_width, body_height):
+        self.slide = slide
+        self.slide_height = slide_height
+        self.body_width = body_width
+        self.body_height = body_height
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        if self.pages:
+            page = {k: v for k, v in self.slide.items() if k not in ("blocks", "subtitle", "notes")}
+            page["title"] = self.slide.get("title", "Slide") + CONTINUED_SUFFIX
+        else:
+            page = {k: v for k, v in self.slide.items() if k != "blocks"}
+        page["blocks"] = []
+        self.pages.append(page)
+        self.text_used = 0.0
+        self.top = TABLE_TOP
+
+    @property
+    def page_is_empty(self):
+        return not self.pages[-1]["blocks"]
+
+    def add(self, block):
+        self.pages[-1]["blocks"].append(block)
+
+    def fit_text(self, height):
+        """Start a new page when `height` more text would overflow the body"""
+        if self.text_used + height > self.body_height and not self.page_is_empty:
+            self.new_page()
+        self.text_used += height
+
+    def add_list(self, block):
+        numbered = block.get("kind") == "numbered_list"
+        start = block.get("start", 1)
+        chunk = []
+        chunk_start = start
+        for offset, item in enumerate(block.get("items", [])):
+            if numbered:
+                height = numbered_item_height(item, start + offset, self.body_width)
+            else:
+                height = bullet_item_height(item, self.body_width)
+            if self.text_used + height > self.body_height and (chunk or not self.page_is_empty):
+                if chunk:
+                    self.add(self._list_chunk(block, chunk, chunk_start))
+                self.new_page()
+                chunk, chunk_start = [], start + offset
+            chunk.append(item)
+            self.text_used += height
+        if chunk:
+            self.add(self._list_chunk(block, chunk, chunk_start))
+
+    @staticmethod
+    def _list_chunk(block, items, start):
+        chunk = dict(block, items=items)
+        if block.get("kind") == "numbered_list":
+            chunk["start"] = start
+        return chunk
+
+    def add_table(self, block):
+        rows = block.get("rows", [])
+        num_cols = len(rows[0]) if rows else 0
+        width = block.get("width", 8)
+        col_widths = block.get("col_widths", [width / num_cols] * num_cols if num_cols else [])
+        font_size = block.get("font_size", 11)
+        heights = [table_row_height(row, col_widths, font_size) for row in rows]
+
+        fixed_top = block.get("top")
+        top = fixed_top if fixed_top is not None else self.top
+        if sum(heights) <= self.slide_height - BOTTOM_MARGIN - top:
+            self.add(block)
+            self.top += positioned_block_height(block)
+            return
+
+        header = block.get("header", True)
+        header_rows = rows[:1] if header else []
+        header_height = heights[0] if header else 0.0
+        body_rows = rows[len(header_rows):]
+        body_heights = heights[len(header_rows):]
+
+        i = 0
+        while i < len(body_rows):
+            top = fixed_top if fixed_top is not None else self.top
+            available = self.slide_height - BOTTOM_MARGIN - top - header_height
+            if body_heights[i] > available and not self.page_is_empty:
+                # Not even one row fits below the existing content
+                self.new_page()
+                continue
+            j, used = i, 0.0
+            while j < len(body_rows) and (j == i or used + body_heights[j] <= available):
+                used += body_heights[j]
+                j += 1
+            part = dict(block, rows=header_rows + body_rows[i:j], height=round(header_height + used, 2))
+            self.add(part)
+            self.top += positioned_block_height(part)
+            i = j
+            if i < len(body_rows):
+                self.new_page()
+
+    def run(self):
+        for block in self.slide.get("blocks", []):
+            kind = block.get("kind", "")
+            if block.get("paginate") is False:
+                self.add(block)
+            elif kind in ("bullets", "numbered_list"):
+                self.add_list(block)
+            elif kind in ("heading", "paragraph") or (kind == "" and "text" in block):
+                self.fit_text(text_block_height(block, self.body_width))
+                self.add(block)
+            elif kind == "table" and block.get("rows"):
+                self.add_table(block)
+            else:
+                self.add(block)
+                self.top += positioned_block_height(block)
+        return self.pages
+
+
+def paginate_slides(slides, slide_height=SLIDE_HEIGHT, body_width=BODY_WIDTH, body_height=BODY_HEIGHT):
+    """Split oversized tables and lists across continuation slides
+
+    Table rows are packed by estimated height with the header row repeated on
+    every page; bullet and numbered items are packed by estimated line height.
+    Slides with "paginate": false are left untouched.
+    """
+    pages = []
+    for slide in slides:
+        if slide.get("type") == "title" or slide.get("paginate") is False:
+            pages.append(slide)
+        else:
+            pages.extend(_Paginator(slide, slide_height, body_width, body_height).run())
+    return pages
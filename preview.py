@@ -0,0 +1,455 @@
+import hashlib
+import json
+import math
+from functools import lru_cache
+from html import escape
+
+from colors import to_hex
+from pagination import (BODY_HEIGHT, BODY_WIDTH, CHAR_WIDTH, HEADING_SIZES, LEVEL_INDENT, LINE_SPACING,
+                        SLIDE_HEIGHT, TABLE_TOP, paginate_slides, positioned_block_height, table_row_height)
+
+# SVG thumbnails of slides, laid out with the same rules as renderer.render_blocks
+# but without building a .pptx package
+
+DPI = 96  # SVG user units per inch
+SLIDE_WIDTH = 10.0
+FONT_FAMILY = "Calibri, Carlito, 'Segoe UI', Arial, sans-serif"
+
+# Placeholder geometry of the default template (left, top, width, height in inches)
+TITLE_BOX = (0.5, 0.3, 9.0, 1.25)
+BODY_BOX = (0.5, 1.75, BODY_WIDTH, BODY_HEIGHT)
+TITLE_SLIDE_TITLE_BOX = (0.75, 2.33, 8.5, 1.61)
+TITLE_SLIDE_SUBTITLE_BOX = (1.5, 4.25, 7.0, 1.92)
+
+CHART_PALETTE = ['#4472C4', '#ED7D31', '#A5A5A5', '#FFC000', '#5B9BD5', '#70AD47']
+PREVIEW_MAX_POINTS = 60
+
+PREVIEW_CACHE_SIZE = 2048
+
+
+def wrap_text(text, size, width):
+    """Greedy word wrap using the same glyph width estimate as pagination"""
+    chars_per_line = max(1, int(width * 72 / (size * CHAR_WIDTH)))
+    lines = []
+    for segment in str(text).split("\n"):
+        line = ""
+        for word in segment.split(" "):
+            while len(word) > chars_per_line:
+                if line:
+                    lines.append(line)
+                    line = ""
+                lines.append(word[:chars_per_line])
+                word = word[chars_per_line:]
+            candidate = f"{line} {word}" if line else word
+            if len(candidate) > chars_per_line:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _px(inches):
+    return round(inches * DPI, 1)
+
+
+class _Canvas:
+    """Accumulates SVG elements for one slide"""
+
+    def __init__(self):
+        self.parts = []
+
+    def rect(self, x, y, w, h, fill='none', stroke='none', stroke_width=1):
+        self.parts.append(f'<rect x="{_px(x)}" y="{_px(y)}" width="{_px(w)}" height="{_px(h)}" '
+                          f'fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"/>')
+
+    def text(self, x, y, text, size, bold=False, italic=False, color='#000000', anchor='start'):
+        weight = ' font-weight="bold"' if bold else ''
+        style = ' font-style="italic"' if italic else ''
+        self.parts.append(f'<text x="{_px(x)}" y="{_px(y)}" font-size="{round(size * DPI / 72, 1)}" '
+                          f'fill="{color}" text-anchor="{anchor}"{weight}{style}>{escape(str(text))}</text>')
+
+    def text_box(self, box, text, size, bold=False, italic=False, color='#000000', align='left', top_pad=0.05):
+        """Wrapped text inside (left, top, width, height); returns the height used"""
+        left, top, width, _ = box
+        anchor, x = {'center': ('middle', left + width / 2), 'right': ('end', left + width - 0.1)}.get(
+            (align or 'left').lower(), ('start', left + 0.1))
+        line_height = size * LINE_SPACING / 72
+        y = top + top_pad
+        for line in wrap_text(text, size, width - 0.2):
+            y += line_height
+            self.text(x, y - line_height * 0.25, line, size, bold, italic, color, anchor)
+        return y - top
+
+    def image(self, x, y, w, h, href):
+        self.parts.append(f'<image x="{_px(x)}" y="{_px(y)}" width="{_px(w)}" height="{_px(h)}" '
+                          f'href="{escape(href)}" preserveAspectRatio="xMidYMid meet"/>')
+
+    def raw(self, element):
+        self.parts.append(element)
+
+    def to_svg(self):
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_px(SLIDE_WIDTH)} {_px(SLIDE_HEIGHT)}" '
+                f'font-family="{FONT_FAMILY}"><rect width="100%" height="100%" fill="#FFFFFF"/>'
+                + ''.join(self.parts) + '</svg>')
+
+
+def _color(spec, default='#000000'):
+    return to_hex(spec) if spec else default
+
+
+def _body_paragraphs(blocks):
+    """Paragraphs the body placeholder receives, mirroring render_heading/paragraph/bullets/numbered_list"""
+    paragraphs = []
+    for block in blocks:
+        kind = block.get("kind", "")
+        if kind == "heading":
+            size = HEADING_SIZES.get(block.get("level", 1), 24)
+            paragraphs.append((block.get("text", ""), 0, size, True, False, block.get("color"), block.get("align", "left")))
+        elif kind == "paragraph":
+            paragraphs.append((block.get("text", ""), 0, block.get("size", 18), block.get("bold", False),
+                               block.get("italic", False), block.get("color"), block.get("align", "left")))
+        elif kind == "bullets":
+            bullet_color = block.get("color")
+            for item in block.get("items", []):
+                if isinstance(item, str):
+                    paragraphs.append((item, 0, 18, False, False, bullet_color, None))
+                    continue
+                paragraphs.append((item.get("text", ""), 0, 18, item.get("bold", True), False,
+                                   item.get("color", bullet_color), None))
+                for sub in item.get("subpoints", []):
+                    if isinstance(sub, str):
+                        paragraphs.append((sub, 1, 18, False, False, bullet_color, None))
+                    else:
+                        paragraphs.append((sub.get("text", ""), 1, 18, False, False,
+                                           sub.get("color", bullet_color), None))
+        elif kind == "numbered_list":
+            color = block.get("color")
+            for i, item in enumerate(block.get("items", []), start=block.get("start", 1)):
+                text = item if isinstance(item, str) else item.get("text", "")
+                item_color = color if isinstance(item, str) else item.get("color", color)
+                paragraphs.append((f"{i}. {text}", 0, 18, False, False, item_color, None))
+        elif kind == "" and "text" in block:
+            paragraphs.append((block["text"], 0, 18, False, False, None, None))
+    return paragraphs
+
+
+def _draw_body(canvas, blocks):
+    left, top, width, height = BODY_BOX
+    y = top + 0.05
+    for text, level, size, bold, italic, color, align in _body_paragraphs(blocks):
+        indent = 0.375 + level * LEVEL_INDENT
+        line_height = size * LINE_SPACING / 72
+        canvas.text(left + 0.1 + level * LEVEL_INDENT, y + line_height * 0.75, "•", size, color=_color(color))
+        y += canvas.text_box((left + indent, y, width - indent, height), text, size, bold, italic,
+                             _color(color), align or 'left', top_pad=0)
+        y += size * 0.2 / 72  # space before the next paragraph
+
+
+def _draw_table(canvas, block, top):
+    rows = block.get("rows", [])
+    if not rows:
+        return
+    num_cols = len(rows[0])
+    left = block.get("left", 1)
+    top = block.get("top", top)
+    width = block.get("width", 8)
+    col_widths = block.get("col_widths", [width / num_cols] * num_cols)[:num_cols]
+    font_size = block.get("font_size", 11)
+    base_height = block.get("height", 0.4 * len(rows)) / len(rows)
+    header = block.get("header", True)
+    header_fill = _color(block.get("header_color", [68, 114, 196]))
+    header_text = _color(block.get("header_text_color", "white"))
+
+    y = top
+    for row_idx, row in enumerate(rows):
+        row_height = max(base_height, table_row_height(row, col_widths, font_size))
+        x = left
+        for col_idx, cell in enumerate(row[:num_cols]):
+            col_width = col_widths[col_idx]
+            if isinstance(cell, dict):
+                text, cell_color, bg = str(cell.get("text", "")), cell.get("color"), cell.get("bg_color")
+            else:
+                text, cell_color, bg = str(cell), None, None
+            if header and row_idx == 0:
+                fill, color, bold = header_fill, header_text, True
+            else:
+                fill = _color(bg) if bg else ('#E9EBF5' if row_idx % 2 else '#CFD5EA')
+                color, bold = '#000000', False
+            if cell_color:
+                color = _color(cell_color)
+            canvas.rect(x, y, col_width, row_height, fill=fill, stroke='#FFFFFF')
+            canvas.text_box((x, y, col_width, row_height), text, font_size, bold, False, color, 'center')
+            x += col_width
+        y += row_height
+
+
+def _draw_text_box(canvas, block):
+    box = (block.get("left", 1), block.get("top", 3), block.get("width", 6), block.get("height", 1))
+    if block.get("bg_color"):
+        canvas.rect(*box, fill=_color(block["bg_color"]))
+    canvas.text_box(box, block.get("text", ""), block.get("font_size", 18), block.get("bold", False),
+                    block.get("italic", False), _color(block.get("color")), block.get("align", "left"))
+
+
+def _draw_picture(canvas, x, y, w, h, path):
+    if str(path).startswith('static/'):
+        canvas.image(x, y, w, h, '/' + str(path))
+    else:
+        canvas.rect(x, y, w, h, fill='#EEEEEE', stroke='#BBBBBB')
+        canvas.text(x + w / 2, y + h / 2, str(path).rsplit('/', 1)[-1], 10, color='#777777', anchor='middle')
+
+
+def _draw_images(canvas, block, top):
+    items = block.get("items", [])
+    count = len(items)
+    if not count:
+        return
+    layout = block.get("layout")
+    for i, img in enumerate(items):
+        path = img.get("path", "") if isinstance(img, dict) else str(img)
+        if layout == "row":
+            width = 8 / count
+            w = width - 0.2
+            _draw_picture(canvas, 0.5 + i * width, top, w, w * 0.75, path)
+        elif layout == "column":
+            height = 4 / count
+            h = height - 0.2
+            _draw_picture(canvas, 2, top + i * height, h * 4 / 3, h, path)
+        elif layout == "grid":
+            r, c = divmod(i, 2)
+            w = 4 - 0.3
+            _draw_picture(canvas, 0.5 + c * 4, top + r * 2, w, min(w * 0.75, 1.9), path)
+
+
+def _draw_chart(canvas, block, top):
+    from charts import prepare_category_chart, prepare_xy_chart
+
+    chart_type = block.get("chart_type", "bar").lower()
+    left, top = block.get("left", 1), block.get("top", top)
+    width, height = block.get("width", 8), block.get("height", 4.5)
+    canvas.rect(left, top, width, height, fill='#FFFFFF', stroke='#D9D9D9')
+    if block.get("title"):
+        canvas.text(left + width / 2, top + 0.35, block["title"], 14, color='#595959', anchor='middle')
+
+    small = dict(block, max_points=min(block.get("max_points", PREVIEW_MAX_POINTS), PREVIEW_MAX_POINTS))
+    colors = [_color(c) for c in block.get("colors", [])] + CHART_PALETTE
+    px0, py0 = left + 0.5, top + 0.6
+    pw, ph = width - 1.0, height - 1.1
+
+    if chart_type == "pie":
+        categories, series = prepare_category_chart(small, "pie")
+        values = [max(0.0, v or 0.0) for v in (series[0][1] if series else [])]
+        total = sum(values)
+        if not total:
+            return
+        cx, cy, r = _px(left + width / 2), _px(py0 + ph / 2), _px(min(pw, ph) / 2)
+        angle = -math.pi / 2
+        for i, value in enumerate(values):
+            sweep = 2 * math.pi * value / total
+            x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            x2, y2 = cx + r * math.cos(angle + sweep), cy + r * math.sin(angle + sweep)
+            large = 1 if sweep > math.pi else 0
+            canvas.raw(f'<path d="M{cx},{cy} L{x1:.1f},{y1:.1f} A{r},{r} 0 {large} 1 {x2:.1f},{y2:.1f} Z" '
+                       f'fill="{CHART_PALETTE[i % len(CHART_PALETTE)]}" stroke="#FFFFFF"/>')
+            angle += sweep
+        return
+
+    if chart_type == "scatter":
+        series = prepare_xy_chart(small)
+        points = [p for _, pts in series for p in pts]
+        xs, ys = [p[0] for p in points], [p[1] for p in points]
+    elif chart_type in ("line", "bar"):
+        categories, series = prepare_category_chart(small, chart_type)
+        xs = list(range(len(categories)))
+        ys = [v for _, values in series for v in values if v is not None]
+    else:
+        return
+    if not xs or not ys:
+        return
+
+    x_min, x_max = min(xs), max(xs)
+    y_min, y_max = min(0.0, min(ys)), max(0.0, max(ys))
+    x_span, y_span = (x_max - x_min) or 1, (y_max - y_min) or 1
+
+    def sx(x):
+        return _px(px0 + (x - x_min) / x_span * pw)
+
+    def sy(y):
+        return _px(py0 + ph - (y - y_min) / y_span * ph)
+
+    canvas.raw(f'<line x1="{_px(px0)}" y1="{sy(0)}" x2="{_px(px0 + pw)}" y2="{sy(0)}" stroke="#BFBFBF"/>')
+    for s_idx, (_, values) in enumerate(series):
+        color = colors[s_idx % len(colors)]
+        if chart_type == "scatter":
+            for x, y in values:
+                canvas.raw(f'<circle cx="{sx(x)}" cy="{sy(y)}" r="3" fill="{color}"/>')
+        elif chart_type == "line":
+            pts = ' '.join(f'{sx(i)},{sy(v)}' for i, v in enumerate(values) if v is not None)
+            canvas.raw(f'<polyline points="{pts}" fill="none" stroke="{color}" stroke-width="2"/>')
+        else:
+            slot = pw / max(1, len(values))
+            bar = slot * 0.8 / len(series)
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                x = px0 + i * slot + slot * 0.1 + s_idx * bar
+                y_top, y_bottom = (sy(v), sy(0)) if v >= 0 else (sy(0), sy(v))
+                canvas.raw(f'<rect x="{_px(x)}" y="{y_top}" width="{_px(bar)}" '
+                           f'height="{round(y_bottom - y_top, 1)}" fill="{color}"/>')
+
+
+def _draw_content_slide(canvas, slide):
+    left, top, width, height = TITLE_BOX
+    title = slide.get("title", "Slide")
+    lines = wrap_text(title, 44, width - 0.2)
+    if "subtitle" in slide:
+        lines_height = (len(lines) + 1) * 44 * LINE_SPACING / 72
+    else:
+        lines_height = len(lines) * 44 * LINE_SPACING / 72
+    # Title placeholder text is vertically centered
+    y = top + max(0.0, (height - lines_height) / 2)
+    used = canvas.text_box((left, y, width, height), title, 44, align='center', top_pad=0)
+    if "subtitle" in slide:
+        canvas.text_box((left, y + used, width, height), slide["subtitle"], 32, color='#404040',
+                        align='center', top_pad=0)
+
+    blocks = slide.get("blocks", [])
+    _draw_body(canvas, blocks)
+
+    current_top = TABLE_TOP
+    for block in blocks:
+        kind = block.get("kind", "")
+        if kind == "table":
+            _draw_table(canvas, block, current_top)
+        elif kind == "chart":
+            _draw_chart(canvas, block, current_top)
+        elif kind == "text_box":
+            _draw_text_box(canvas, block)
+        elif kind == "images":
+            _draw_images(canvas, block, current_top)
+        current_top += positioned_block_height(block)
+
+
+def _draw_title_slide(canvas, meta):
+    canvas.text_box(TITLE_SLIDE_TITLE_BOX, meta.get("title", "Presentation"), 44, align='center', top_pad=0.4)
+    if meta.get("subtitle"):
+        canvas.text_box(TITLE_SLIDE_SUBTITLE_BOX, meta["subtitle"], 32, color='#888888', align='center')
+
+
+def _draw_college_title_slide(canvas, college_data):
+    """Mirror of renderer.create_college_title_slide
+
+    Colors and layout of a stored college profile arrive in `college_data`
+    (see main.resolve_college), as used by college_profiles.build_fragment.
+    """
+    left_layout = college_data.get('layout') == 'left'
+    canvas.image(0.5 if left_layout else 3.5, 0.5, 3.0, 1.2, college_data.get('logo_url', '/static/college.png'))
+    canvas.text_box((1, 2, 8, 0.5), college_data.get('college_name', 'College/University Name'), 24, True,
+                    color=_color(college_data.get('name_color'), '#000080'),
+                    align='left' if left_layout else 'center')
+    canvas.text_box((1, 2.7, 8, 0.8), college_data.get('title', 'Presentation Title'), 32, True,
+                    color=_color(college_data.get('title_color')), align='center')
+    header_fill = _color(college_data.get('header_color'), '#C8C8C8')
+
+    if college_data.get('type') == 'single':
+        lines = [("Submitted By:", 16, True)] + [
+            (f"{label}: {college_data.get(key, '')}", 14, False)
+            for label, key in (("Name", "student_name"), ("USN", "usn"), ("Course", "course"),
+                               ("Semester", "semester"))
+        ] + [(f"Submitted To: {college_data.get('professor', '')}", 14, True)]
+        y = 3.8
+        for text, size, bold in lines:
+            y += canvas.text_box((2, y, 6, 0.4), text, size, bold, align='center') + 0.05
+    elif college_data.get('type') == 'group':
+        canvas.text_box((2, 3.7, 6, 0.4), "Submitted By:", 16, True, align='center')
+        students = college_data.get('students', [])
+        if students:
+            rows = [["Name", "USN"]] + [[s.get('name', ''), s.get('usn', '')] for s in students]
+            y = 4.2
+            for idx, row in enumerate(rows):
+                fill = header_fill if idx == 0 else ('#E9EBF5' if idx % 2 else '#CFD5EA')
+                for col, text in enumerate(row):
+                    canvas.rect(2.5 + col * 2.5, y, 2.5, 0.4, fill=fill, stroke='#FFFFFF')
+                    canvas.text_box((2.5 + col * 2.5, y, 2.5, 0.4), text, 12 if idx == 0 else 11,
+                                    idx == 0, align='center')
+                y += 0.4
+        canvas.text_box((2, 6.5, 6, 0.4), f"Submitted To: {college_data.get('professor', '')}", 14, True,
+                        align='center')
+
+
+@lru_cache(maxsize=PREVIEW_CACHE_SIZE)
+def _render_page(kind, page_json):
+    """SVG for one page; cached so unchanged slides are served without re-layout"""
+    page = json.loads(page_json)
+    canvas = _Canvas()
+    if kind == 'college':
+        _draw_college_title_slide(canvas, page)
+    elif kind == 'title':
+        _draw_title_slide(canvas, page)
+    else:
+        _draw_content_slide(canvas, page)
+    return canvas.to_svg()
+
+
+def _page_entry(index, source, kind, page):
+    page_json = json.dumps(page, sort_keys=True, default=str)
+    return {
+        'index': index,
+        'source': source,
+        'hash': hashlib.sha1(f"{kind}:{page_json}".encode()).hexdigest()[:16],
+        'kind': kind,
+        'page_json': page_json,
+    }
+
+
+def preview_deck(content, jain_data=None, only=None, known=None, geometry=None):
+    """Render SVG previews of every slide the deck would produce
+
+    `only` limits rendering to the given source slide indexes (positions in
+    content["slides"], or "title") so the editor can refresh one slide.
+    `known` maps page index -> hash the client already has; those pages are
+    returned without an svg. Pagination is applied exactly as in the .pptx;
+    `geometry` is the (slide height, body width, body height) of a custom
+    template, whose theme itself is not drawn.
+    """
+    meta = content.get("meta", {})
+    if jain_data and jain_data.get('enabled'):
+        pages = [_page_entry(0, 'title', 'college', jain_data)]
+    else:
+        pages = [_page_entry(0, 'title', 'title', {"title": meta.get("title", "Presentation"),
+                                                   "subtitle": meta.get("subtitle", "")})]
+
+    paginate = meta.get("paginate", True)
+    for source, slide in enumerate(content.get("slides", [])):
+        if slide.get("type") == "title":
+            continue
+        for page in (paginate_slides([slide], *(geometry or ())) if paginate else [slide]):
+            pages.append(_page_entry(len(pages), source, 'content', page))
+
+    wanted = None if only is None else {str(s) for s in only}
+    known = {str(k): v for k, v in (known or {}).items()}
+    results = []
+    for entry in pages:
+        if wanted is not None and str(entry['source']) not in wanted:
+            continue
+        result = {'index': entry['index'], 'source': entry['source'], 'hash': entry['hash']}
+        if known.get(str(entry['index'])) != entry['hash']:
+            result['svg'] = _render_page(entry['kind'], entry['page_json'])
+        results.append(result)
+    return {'count': len(pages), 'slides': results}
+
+
+def preview_html(preview):
+    """Standalone HTML page showing every slide thumbnail"""
+    figures = ''.join(
+        f'<figure id="slide-{s["index"]}" data-hash="{s["hash"]}">{s.get("svg", "")}'
+        f'<figcaption>Slide {s["index"] + 1}</figcaption></figure>'
+        for s in preview['slides']
+    )
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Slide preview</title><style>'
+            'body{font-family:sans-serif;background:#f0f0f0;display:flex;flex-wrap:wrap;gap:16px;padding:16px}'
+            'figure{margin:0;width:320px}svg{width:100%;box-shadow:0 1px 4px rgba(0,0,0,.3)}'
+            'figcaption{text-align:center;font-size:12px;color:#555}</style></head>'
+            f'<body>{figures}</body></html>')
@@ -0,0 +1,598 @@
+import os
+from contextvars import ContextVar
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+from charts import prepare_category_chart, prepare_xy_chart
+from colors import to_rgb
+from pagination import paginate_slides
+from theme_templates import DEFAULT_ROLES
+
+FONT = "Calibri"
+
+# True while rendering onto an uploaded template: runs then keep the theme's
+# fonts and colors instead of being forced to FONT and black
+_theme_styles = ContextVar('theme_styles', default=False)
+
+# Helper function to parse color
+def parse_color(color_spec):
+    """Parse color from various formats: 'red', '#FF0000', or [255, 0, 0]"""
+    return RGBColor(*to_rgb(color_spec))
+
+def style(run, size=18, bold=False, italic=False, color=None, underline=False):
+    """Enhanced style function with more formatting options"""
+    theme_styles = _theme_styles.get()
+    if not theme_styles:
+        run.font.name = FONT
+    run.font.size = Pt(size)
+    run.font.bold = bold
+    run.font.italic = italic
+    run.font.underline = underline
+    if color:
+        run.font.color.rgb = parse_color(color)
+    elif not theme_styles:
+        run.font.color.rgb = RGBColor(0, 0, 0)
+
+def add_text(tf, text, level=0, size=18, bold=False, italic=False, color=None, align=None):
+    """Enhanced text function with alignment and formatting"""
+    p = tf.add_paragraph() if tf.text else tf.paragraphs[0]
+    p.text = text
+    p.level = level
+    if align:
+        alignment_map = {
+            'left': PP_ALIGN.LEFT,
+            'center': PP_ALIGN.CENTER,
+            'right': PP_ALIGN.RIGHT,
+            'justify': PP_ALIGN.JUSTIFY
+        }
+        p.alignment = alignment_map.get(align.lower(), PP_ALIGN.LEFT)
+    for r in p.runs:
+        style(r, size, bold, italic, color)
+
+def render_heading(tf, block):
+    """Render heading block"""
+    text = block.get("text", "")
+    level = block.get("level", 1)  # 1=large, 2=medium, 3=small
+    color = block.get("color")
+    align = block.get("align", "left")
+    
+    size_map = {1: 28, 2: 24, 3: 20}
+    size = size_map.get(level, 24)
+    
+    add_text(tf, text, level=0, size=size, bold=True, color=color, align=align)
+
+def render_paragraph(tf, block):
+    """Render styled paragraph"""
+    text = block.get("text", "")
+    size = block.get("size", 18)
+    color = block.get("color")
+    bold = block.get("bold", False)
+    italic = block.get("italic", False)
+    align = block.get("align", "left")
+    
+    add_text(tf, text, size=size, bold=bold, italic=italic, color=color, align=align)
+
+def render_bullets(tf, block):
+    """Enhanced bullet rendering with styles"""
+    items = block.get("items", [])
+    bullet_color = block.get("color")
+    
+    for item in items:
+        if isinstance(item, str):
+            add_text(tf, item, color=bullet_color)
+        else:
+            # Styled bullet
+            text = item.get("text", "")
+            bold = item.get("bold", True)
+            color = item.get("color", bullet_color)
+            add_text(tf, text, bold=bold, color=color)
+            
+            # Sub-points
+            for sub in item.get("subpoints", []):
+                if isinstance(sub, str):
+                    add_text(tf, sub, level=1, color=bullet_color)
+                else:
+                    sub_text = sub.get("text", "")
+                    sub_color = sub.get("color", bullet_color)
+                    add_text(tf, sub_text, level=1, color=sub_color)
+
+def render_table(slide, block, top=2.5):
+    """Render a table on the slide"""
+    rows = block.get("rows", [])
+    if not rows:
+        return
+    
+    num_rows = len(rows)
+    num_cols = len(rows[0]) if rows else 0
+    
+    # Position and size
+    left = Inches(block.get("left", 1))
+    top = Inches(block.get("top", top))
+    width = Inches(block.get("width", 8))
+    height = Inches(block.get("height", 0.4 * num_rows))
+    
+    # Create table
+    table = slide.shapes.add_table(num_rows, num_cols, left, top, width, height).table
+    
+    # Set column widths
+    col_widths = block.get("col_widths", [width.inches / num_cols] * num_cols)
+    for i, col_width in enumerate(col_widths[:num_cols]):
+        table.columns[i].width = Inches(col_width)
+    
+    # Fill table
+    header = block.get("header", True)
+    header_color = parse_color(block.get("header_color", [68, 114, 196]))  # Blue
+    header_text_color = parse_color(block.get("header_text_color", "white"))
+    
+    for row_idx, row_data in enumerate(rows):
+        for col_idx, cell_data in enumerate(row_data):
+            cell = table.cell(row_idx, col_idx)
+            
+            # Cell text
+            if isinstance(cell_data, dict):
+                cell.text = str(cell_data.get("text", ""))
+                cell_color = cell_data.get("color")
+                bg_color = cell_data.get("bg_color")
+            else:
+                cell.text = str(cell_data)
+                cell_color = None
+                bg_color = None
+            
+            # Format cell
+            cell.text_frame.paragraphs[0].font.size = Pt(block.get("font_size", 11))
+            cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+            
+            # Header row styling
+            if header and row_idx == 0:
+                cell.text_frame.paragraphs[0].font.bold = True
+                cell.text_frame.paragraphs[0].font.color.rgb = header_text_color
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = header_color
+            elif bg_color:
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = parse_color(bg_color)
+            
+            if cell_color:
+                cell.text_frame.paragraphs[0].font.color.rgb = parse_color(cell_color)
+
+def render_text_box(slide, block):
+    """Render a text box with custom positioning and styling"""
+    text = block.get("text", "")
+    left = Inches(block.get("left", 1))
+    top = Inches(block.get("top", 3))
+    width = Inches(block.get("width", 6))
+    height = Inches(block.get("height", 1))
+    
+    # Create text box
+    text_box = slide.shapes.add_textbox(left, top, width, height)
+    tf = text_box.text_frame
+    tf.word_wrap = True
+    
+    p = tf.paragraphs[0]
+    p.text = text
+    
+    # Styling
+    font_size = block.get("font_size", 18)
+    bold = block.get("bold", False)
+    italic = block.get("italic", False)
+    color = block.get("color")
+    bg_color = block.get("bg_color")
+    align = block.get("align", "left")
+    
+    p.font.size = Pt(font_size)
+    p.font.bold = bold
+    p.font.italic = italic
+    if color:
+        p.font.color.rgb = parse_color(color)
+    
+    # Alignment
+    alignment_map = {
+        'left': PP_ALIGN.LEFT,
+        'center': PP_ALIGN.CENTER,
+        'right': PP_ALIGN.RIGHT,
+        'justify': PP_ALIGN.JUSTIFY
+    }
+    p.alignment = alignment_map.get(align.lower(), PP_ALIGN.LEFT)
+    
+    # Background color
+    if bg_color:
+        text_box.fill.solid()
+        text_box.fill.fore_color.rgb = parse_color(bg_color)
+
+def render_numbered_list(tf, block):
+    """Render numbered list"""
+    items = block.get("items", [])
+    start = block.get("start", 1)
+    color = block.get("color")
+    
+    for i, item in enumerate(items, start=start):
+        if isinstance(item, str):
+            add_text(tf, f"{i}. {item}", color=color)
+        else:
+            text = item.get("text", "")
+            item_color = item.get("color", color)
+            add_text(tf, f"{i}. {text}", color=item_color)
+
+def render_images(slide, block, top=2.5):
+    items = block["items"]
+    count = len(items)
+
+    if block["layout"] == "row":
+        width = 8 / count
+        for i, img in enumerate(items):
+            try:
+                slide.shapes.add_picture(
+                    img["path"],
+                    Inches(0.5 + i * width),
+                    Inches(top),
+                    width=Inches(width - 0.2)
+                )
+            except FileNotFoundError:
+                print(f"Warning: Image file not found at {img['path']}")
+
+    elif block["layout"] == "column":
+        height = 4 / count
+        for i, img in enumerate(items):
+            try:
+                slide.shapes.add_picture(
+                    img["path"],
+                    Inches(2),
+                    Inches(top + i * height),
+                    height=Inches(height - 0.2)
+                )
+            except FileNotFoundError:
+                print(f"Warning: Image file not found at {img['path']}")
+
+    elif block["layout"] == "grid":
+        cols = 2
+        rows = (count + 1) // 2
+        w, h = 4, 2
+        for idx, img in enumerate(items):
+            try:
+                r, c = divmod(idx, cols)
+                slide.shapes.add_picture(
+                    img["path"],
+                    Inches(0.5 + c * w),
+                    Inches(top + r * h),
+                    width=Inches(w - 0.3)
+                )
+            except FileNotFoundError:
+                print(f"Warning: Image file not found at {img['path']}")
+
+CHART_TYPES = {
+    'line': XL_CHART_TYPE.LINE,
+    'bar': XL_CHART_TYPE.COLUMN_CLUSTERED,
+    'pie': XL_CHART_TYPE.PIE,
+    'scatter': XL_CHART_TYPE.XY_SCATTER,
+}
+
+def render_chart(slide, block, top=2.5):
+    """Render a native chart (line, bar, pie, scatter) with downsampled data"""
+    chart_type = block.get("chart_type", "bar").lower()
+    if chart_type not in CHART_TYPES:
+        print(f"Warning: Unsupported chart type '{chart_type}'")
+        return
+    
+    # Position and size
+    left = Inches(block.get("left", 1))
+    top = Inches(block.get("top", top))
+    width = Inches(block.get("width", 8))
+    height = Inches(block.get("height", 4.5))
+    
+    if chart_type == "scatter":
+        series = prepare_xy_chart(block)
+        if not series:
+            return
+        chart_data = XyChartData()
+        for name, points in series:
+            s = chart_data.add_series(name)
+            for x, y in points:
+                s.add_data_point(x, y)
+    else:
+        categories, series = prepare_category_chart(block, chart_type)
+        if not series:
+            return
+        chart_data = CategoryChartData()
+        chart_data.categories = categories
+        for name, values in series:
+            chart_data.add_series(name, values)
+    
+    chart = slide.shapes.add_chart(CHART_TYPES[chart_type], left, top, width, height, chart_data).chart
+    
+    # Title and legend
+    title = block.get("title")
+    chart.has_title = bool(title)
+    if title:
+        chart.chart_title.text_frame.text = title
+    chart.has_legend = block.get("legend", chart_type == "pie" or len(series) > 1)
+    if chart.has_legend:
+        chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+        chart.legend.include_in_layout = False
+    
+    # Per-series colors
+    colors = block.get("colors", [])
+    if chart_type != "pie":
+        for plot_series, color in zip(chart.plots[0].series, colors):
+            fmt = plot_series.format
+            if chart_type == "line":
+                fmt.line.color.rgb = parse_color(color)
+            else:
+                fmt.fill.solid()
+                fmt.fill.fore_color.rgb = parse_color(color)
+
+def render_blocks(slide, blocks):
+    """Enhanced block renderer supporting multiple content types"""
+    # Check if we have a text placeholder
+    body = next((ph for ph in slide.placeholders if ph.placeholder_format.idx == 1), None)
+    
+    if body is not None and body.has_text_frame:
+        tf = body.text_frame
+        tf.clear()
+    else:
+        tf = None
+    
+    current_top = 2.5  # Starting position for non-text elements
+    
+    for block in blocks:
+        kind = block.get("kind", "")
+        
+        # Text-based blocks (use placeholder text frame)
+        if kind == "heading" and tf:
+            render_heading(tf, block)
+            
+        elif kind == "paragraph" and tf:
+            render_paragraph(tf, block)
+            
+        elif kind == "bullets" and tf:
+            render_bullets(tf, block)
+            
+        elif kind == "numbered_list" and tf:
+            render_numbered_list(tf, block)
+        
+        # Positioned blocks (custom positioning)
+        elif kind == "table":
+            render_table(slide, block, current_top)
+            current_top += block.get("height", 2) + 0.3
+            
+        elif kind == "chart":
+            render_chart(slide, block, current_top)
+            current_top += block.get("height", 4.5) + 0.3
+            
+        elif kind == "text_box":
+            render_text_box(slide, block)
+            
+        elif kind == "images":
+            render_images(slide, block, current_top)
+            # Calculate height used by images
+            if block.get("layout") == "column":
+                current_top += block.get("height", 4)
+            else:
+                current_top += 2.5
+        
+        # Legacy support for old "paragraph" without explicit kind
+        elif "text" in block and kind == "" and tf:
+            add_text(tf, block["text"])
+
+
+def create_college_title_slide(prs, college_data, layout_index=6, fragment=None):
+    """Create custom college/university title slide
+
+    `fragment` is a pre-rendered college_profiles.TitleFragment holding the
+    logo and college name of a stored profile.
+    """
+    # Use blank layout for custom design
+    slide = prs.slides.add_slide(prs.slide_layouts[layout_index])  # Blank layout
+    
+    if fragment is not None:
+        fragment.apply(slide)
+    else:
+        # Add college logo at top center (if exists)
+        logo_path = 'static/college.png'
+        if os.path.exists(logo_path):
+            left = Inches(3.5)  # Center position
+            top = Inches(0.5)
+            height = Inches(1.2)
+            slide.shapes.add_picture(logo_path, left, top, height=height)
+        
+        # Add college/university name
+        uni_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(0.5))
+        uni_tf = uni_box.text_frame
+        uni_tf.text = college_data.get('college_name', 'College/University Name')
+        uni_p = uni_tf.paragraphs[0]
+        uni_p.alignment = PP_ALIGN.CENTER
+        uni_p.font.size = Pt(24)
+        uni_p.font.bold = True
+        uni_p.font.color.rgb = RGBColor(0, 0, 128)
+    
+    # Add presentation title
+    title_box = slide.shapes.add_textbox(Inches(1), Inches(2.7), Inches(8), Inches(0.8))
+    title_tf = title_box.text_frame
+    title_tf.text = college_data.get('title', 'Presentation Title')
+    title_tf.word_wrap = True
+    title_p = title_tf.paragraphs[0]
+    title_p.alignment = PP_ALIGN.CENTER
+    title_p.font.size = Pt(32)
+    title_p.font.bold = True
+    title_p.font.color.rgb = fragment.title_color if fragment is not None else RGBColor(0, 0, 0)
+    
+    # Check if single or group
+    if college_data.get('type') == 'single':
+        # Single student details
+        details_top = 3.8
+        details_box = slide.shapes.add_textbox(Inches(2), Inches(details_top), Inches(6), Inches(2.5))
+        details_tf = details_box.text_frame
+        details_tf.word_wrap = True
+        
+        # Submitted by
+        p = details_tf.paragraphs[0]
+        p.text = "Submitted By:"
+        p.font.size = Pt(16)
+        p.font.bold = True
+        p.alignment = PP_ALIGN.CENTER
+        
+        # Student details
+        student_info = [
+            f"Name: {college_data.get('student_name', '')}",
+            f"USN: {college_data.get('usn', '')}",
+            f"Course: {college_data.get('course', '')}",
+            f"Semester: {college_data.get('semester', '')}"
+        ]
+        
+        for info in student_info:
+            p = details_tf.add_paragraph()
+            p.text = info
+            p.font.size = Pt(14)
+            p.alignment = PP_ALIGN.CENTER
+            p.space_before = Pt(6)
+        
+        # Submitted to
+        p = details_tf.add_paragraph()
+        p.text = f"\nSubmitted To: {college_data.get('professor', '')}"
+        p.font.size = Pt(14)
+        p.font.bold = True
+        p.alignment = PP_ALIGN.CENTER
+        p.space_before = Pt(12)
+        
+    elif college_data.get('type') == 'group':
+        # Group - create table for students
+        students = college_data.get('students', [])
+        
+        # Add "Submitted By:" text
+        sub_box = slide.shapes.add_textbox(Inches(2), Inches(3.7), Inches(6), Inches(0.4))
+        sub_tf = sub_box.text_frame
+        sub_p = sub_tf.paragraphs[0]
+        sub_p.text = "Submitted By:"
+        sub_p.font.size = Pt(16)
+        sub_p.font.bold = True
+        sub_p.alignment = PP_ALIGN.CENTER
+        
+        # Create table
+        if students:
+            rows = len(students) + 1  # +1 for header
+            cols = 2
+            left = Inches(2.5)
+            top = Inches(4.2)
+            width = Inches(5)
+            height = Inches(0.4 * rows)
+            
+            table = slide.shapes.add_table(rows, cols, left, top, width, height).table
+            
+            # Set column widths
+            table.columns[0].width = Inches(2.5)
+            table.columns[1].width = Inches(2.5)
+            
+            # Header row
+            table.cell(0, 0).text = "Name"
+            table.cell(0, 1).text = "USN"
+            
+            for i, cell in enumerate([table.cell(0, 0), table.cell(0, 1)]):
+                cell.text_frame.paragraphs[0].font.bold = True
+                cell.text_frame.paragraphs[0].font.size = Pt(12)
+                cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = fragment.header_color if fragment is not None else RGBColor(200, 200, 200)
+            
+            # Data rows
+            for idx, student in enumerate(students):
+                table.cell(idx + 1, 0).text = student.get('name', '')
+                table.cell(idx + 1, 1).text = student.get('usn', '')
+                
+                for col in range(2):
+                    cell = table.cell(idx + 1, col)
+                    cell.text_frame.paragraphs[0].font.size = Pt(11)
+                    cell.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+        
+        # Submitted to
+        prof_box = slide.shapes.add_textbox(Inches(2), Inches(6.5), Inches(6), Inches(0.4))
+        prof_tf = prof_box.text_frame
+        prof_p = prof_tf.paragraphs[0]
+        prof_p.text = f"Submitted To: {college_data.get('professor', '')}"
+        prof_p.font.size = Pt(14)
+        prof_p.font.bold = True
+        prof_p.alignment = PP_ALIGN.CENTER
+    
+    return slide
+
+
+def build_presentation(content, jain_data=None, on_slide=None, college=None):
+    """Build the full deck for `content` and optional college title slide data
+
+    `on_slide`, if given, is called with each slide as soon as it is fully
+    rendered (used by the streaming package writer). `meta.template` selects
+    an uploaded template by id; slides may then pick a layout by name.
+    `college` is the TitleFragment of a stored college profile.
+    """
+    template = content["meta"].get("template")
+    if template:
+        from theme_templates import open_template
+        prs, template_meta = open_template(template)
+        roles, layout_map = template_meta['roles'], template_meta['layout_map']
+    else:
+        prs = Presentation()
+        roles, layout_map = DEFAULT_ROLES, {}
+
+    token = _theme_styles.set(bool(template))
+    try:
+        _render_slides(prs, content, jain_data, on_slide, roles, layout_map, college)
+    finally:
+        _theme_styles.reset(token)
+    return prs
+
+
+def _render_slides(prs, content, jain_data, on_slide, roles, layout_map, college):
+    # Add college title slide if requested
+    if jain_data and jain_data.get('enabled'):
+        slide = create_college_title_slide(prs, jain_data, roles['blank'], college)
+    else:
+        # Standard title slide
+        slide = prs.slides.add_slide(prs.slide_layouts[roles['title']])
+        if slide.shapes.title is not None:
+            slide.shapes.title.text = content["meta"].get("title", "Presentation")
+        else:
+            box = slide.shapes.add_textbox(Inches(0.5), Inches(2.5), prs.slide_width - Inches(1), Inches(1.5))
+            box.text_frame.text = content["meta"].get("title", "Presentation")
+            box.text_frame.word_wrap = True
+            box.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+            box.text_frame.paragraphs[0].font.size = Pt(44)
+        subtitle = next((ph for ph in slide.placeholders if ph.placeholder_format.idx != 0), None)
+        if subtitle is not None and subtitle.has_text_frame:
+            subtitle.text = content["meta"].get("subtitle", "")
+    if on_slide:
+        on_slide(slide)
+
+    # Split oversized tables and lists across continuation slides
+    slides = content["slides"]
+    if content["meta"].get("paginate", True):
+        # Layouts without a body placeholder paginate with the default body geometry
+        body = prs.slide_layouts[roles['content']].placeholders.get(idx=1)
+        if body is not None and body.width is not None and body.height is not None:
+            slides = paginate_slides(slides, prs.slide_height.inches, body.width.inches, body.height.inches)
+        else:
+            slides = paginate_slides(slides, prs.slide_height.inches)
+
+    # Content slides
+    for s in slides:
+        if s.get("type") == "title":
+            continue
+
+        layout = layout_map.get(s.get("layout"), roles['content'])
+        slide = prs.slides.add_slide(prs.slide_layouts[layout])
+        if slide.shapes.title is not None:
+            slide.shapes.title.text = s.get("title", "Slide")
+
+            if "subtitle" in s:
+                p = slide.shapes.title.text_frame.add_paragraph()
+                p.text = s["subtitle"]
+                p.level = 1
+
+        render_blocks(slide, s.get("blocks", []))
+
+        if "notes" in s:
+            slide.notes_slide.notes_text_frame.text = s["notes"]
+
+        if on_slide:
+            on_slide(slide)
@@ -0,0 +1,213 @@
+import os
+import threading
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Compression level per part type; None means the part is stored uncompressed
+SAVE_PROFILES = {
+    'fast': {'xml': 1, 'media': None, 'binary': 1},
+    'small': {'xml': 9, 'media': None, 'binary': 9},
+}
+
+DEFAULT_SAVE_PROFILE = os.getenv('PPT_SAVE_PROFILE', 'fast')
+
+# Media formats that are already compressed, deflating them again only costs CPU
+MEDIA_EXTENSIONS = {
+    'png', 'jpg', 'jpeg', 'jpe', 'jfif', 'gif', 'tif', 'tiff', 'wdp',
+    'mp3', 'mp4', 'm4a', 'm4v', 'mov', 'wma', 'wmv', 'avi', 'zip',
+}
+
+SAVE_WORKERS = int(os.getenv('PPT_SAVE_WORKERS', min(8, (os.cpu_count() or 1) + 2)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Lazily create the thread pool shared by all saves in this process"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SAVE_WORKERS,
+                                               thread_name_prefix='pptx-save')
+    return _executor
+
+
+def part_kind(membername):
+    """Classify a package member as 'xml', 'media' or 'binary'"""
+    ext = membername.rsplit('.', 1)[-1].lower() if '.' in membername else ''
+    if ext in ('xml', 'rels'):
+        return 'xml'
+    if ext in MEDIA_EXTENSIONS:
+        return 'media'
+    return 'binary'
+
+
+def _compress_member(membername, get_blob, profile):
+    """Serialize and compress one package member (runs on the thread pool)"""
+    blob = get_blob()
+    level = profile[part_kind(membername)]
+    crc = zlib.crc32(blob)
+    if level is None:
+        return membername, zipfile.ZIP_STORED, blob, len(blob), crc
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(blob) + compressor.flush()
+    return membername, zipfile.ZIP_DEFLATED, data, len(blob), crc
+
+
+def _write_precompressed(zf, membername, compress_type, data, file_size, crc):
+    """Append an already compressed member to an open ZipFile"""
+    zinfo = zipfile.ZipInfo(membername, date_time=(1980, 1, 1, 0, 0, 0))
+    zinfo.compress_type = compress_type
+    zinfo.external_attr = 0o600 << 16
+    zinfo.file_size = file_size
+    zinfo.compress_size = len(data)
+    zinfo.CRC = crc
+    zinfo.header_offset = zf.fp.tell()
+    zf.fp.write(zinfo.FileHeader())
+    zf.fp.write(data)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+    zf._didModify = True
+
+
+def iter_package_members(prs):
+    """Yield (membername, blob_getter) for every member of the presentation package"""
+    from pptx.opc.oxml import serialize_part_xml
+    from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+    from pptx.opc.serialized import _ContentTypesItem
+
+    package = prs.part.package
+    parts = list(package.iter_parts())
+
+    yield CONTENT_TYPES_URI.membername, lambda: serialize_part_xml(_ContentTypesItem.xml_for(parts))
+    yield PACKAGE_URI.rels_uri.membername, lambda: package._rels.xml
+    for part in parts:
+        yield part.partname.membername, (lambda p=part: p.blob)
+        if part._rels:
+            yield part.partname.rels_uri.membername, (lambda p=part: p.rels.xml)
+
+
+def save_presentation(prs, pkg_file, profile=None):
+    """Save `prs` to `pkg_file` serializing and compressing parts in parallel
+
+    `profile` is a key of SAVE_PROFILES ('fast' or 'small'). zlib releases the
+    GIL while compressing, so parts are compressed concurrently on a thread pool
+    and then written to the archive in package order.
+    """
+    profile_name = profile or DEFAULT_SAVE_PROFILE
+    if profile_name not in SAVE_PROFILES:
+        raise ValueError(f"Unknown save profile: {profile_name}")
+    settings = SAVE_PROFILES[profile_name]
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(_compress_member, membername, get_blob, settings)
+        for membername, get_blob in iter_package_members(prs)
+    ]
+
+    with zipfile.ZipFile(pkg_file, 'w') as zf:
+        for future in futures:
+            _write_precompressed(zf, *future.result())
+
+
+def _slide_owned_parts(slide_part):
+    """Parts that belong to a single slide: the slide, its notes and its charts"""
+    from pptx.parts.chart import ChartPart
+    from pptx.parts.embeddedpackage import EmbeddedPackagePart
+    from pptx.parts.slide import NotesSlidePart
+
+    yield slide_part
+    for rel in slide_part.rels.values():
+        if rel.is_external:
+            continue
+        part = rel.target_part
+        if isinstance(part, NotesSlidePart):
+            yield part
+        elif isinstance(part, ChartPart):
+            yield part
+            for chart_rel in part.rels.values():
+                if not chart_rel.is_external and isinstance(chart_rel.target_part, EmbeddedPackagePart):
+                    yield chart_rel.target_part
+
+
+def _release_part(part):
+    """Drop a written part's XML tree or blob so it can be garbage collected"""
+    if hasattr(part, '_element'):
+        part._element = None
+    else:
+        part._blob = b''
+    for cached in ('slide', 'notes_slide', 'chart', 'chart_workbook'):
+        part.__dict__.pop(cached, None)
+
+
+class StreamingPackageWriter:
+    """Write a presentation package incrementally, one slide at a time
+
+    `write_slide()` serializes a finished slide (with its notes and charts)
+    into the archive and releases its XML tree, so peak memory no longer
+    grows with deck size. Presentation-level parts, shared media and
+    `[Content_Types].xml` are written by `finish()`.
+    """
+
+    def __init__(self, pkg_file, profile=None):
+        profile_name = profile or DEFAULT_SAVE_PROFILE
+        if profile_name not in SAVE_PROFILES:
+            raise ValueError(f"Unknown save profile: {profile_name}")
+        self._settings = SAVE_PROFILES[profile_name]
+        self._executor = _get_executor()
+        self._zf = zipfile.ZipFile(pkg_file, 'w')
+        self._pending = deque()
+        self._written = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _submit(self, membername, blob):
+        self._pending.append(self._executor.submit(_compress_member, membername, lambda: blob, self._settings))
+
+    def _drain(self, wait=False):
+        """Write compressed members to the archive in submission order"""
+        while self._pending and (wait or self._pending[0].done()):
+            _write_precompressed(self._zf, *self._pending.popleft().result())
+
+    def _write_part(self, part):
+        self._submit(part.partname.membername, part.blob)
+        if part._rels:
+            self._submit(part.partname.rels_uri.membername, part.rels.xml)
+        self._written.add(part.partname)
+
+    def write_slide(self, slide):
+        """Serialize a fully rendered slide and release its parts"""
+        for part in list(_slide_owned_parts(slide.part)):
+            if part.partname in self._written:
+                continue
+            self._write_part(part)
+            _release_part(part)
+        self._drain()
+
+    def finish(self, prs):
+        """Write every part not streamed yet plus the package-level items"""
+        from pptx.opc.oxml import serialize_part_xml
+        from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+        from pptx.opc.serialized import _ContentTypesItem
+
+        package = prs.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            if part.partname not in self._written:
+                self._write_part(part)
+        self._submit(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+        self._submit(CONTENT_TYPES_URI.membername, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        self._drain(wait=True)
+
+    def close(self):
+        self._drain(wait=True)
+        self._zf.close()
@@ -31,12 +31,7 @@ fi
 
 # Initialize database
 echo "Initializing database..."
-python3 -c "
-from main import app, db
-with app.app_context():
-    db.create_all()
-    print('✓ Database initialized successfully')
-"
+flask --app main init-db
 
 echo ""
 echo "✅ Setup complete!"
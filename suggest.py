@@ -0,0 +1,140 @@
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+# In-memory prefix index over values users have already submitted, so the
+# form can autocomplete without a database query per keystroke
+
+# Student names and USNs are deliberately not indexed: anyone could read
+# them back by walking prefixes
+FIELDS = ('college', 'course', 'professor')
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 25
+MAX_SCAN = 2000  # index entries examined per query before ranking
+
+# Seconds after which the index is rebuilt from the database, to pick up
+# generations handled by other worker processes
+REFRESH_SECONDS = int(os.getenv('PPT_SUGGEST_REFRESH', 600))
+
+_WORD_START = re.compile(r'(?:^|(?<=[\s\-_.,/()]))\w', re.UNICODE)
+
+
+def normalize(value):
+    return ' '.join(str(value).lower().split())
+
+
+def _word_suffixes(key):
+    """The key itself and every suffix starting at a word, so 'uni' matches 'Jain University'"""
+    return {key[m.start():] for m in _WORD_START.finditer(key)} | {key}
+
+
+class _FieldIndex:
+    """Sorted array of (word suffix, value key) with use counts per value"""
+
+    def __init__(self):
+        self.entries = []
+        self.values = {}  # normalized value -> [display value, count]
+
+    def add(self, value, count=1, bulk=False):
+        value = ' '.join(str(value).split())
+        if not value:
+            return
+        key = value.lower()
+        if key in self.values:
+            self.values[key][1] += count
+            return
+        self.values[key] = [value, count]
+        for suffix in _word_suffixes(key):
+            if bulk:
+                self.entries.append((suffix, key))
+            else:
+                insort(self.entries, (suffix, key))
+
+    def search(self, prefix, limit):
+        start = bisect_left(self.entries, (prefix,))
+        matches = {}
+        for suffix, key in self.entries[start:start + MAX_SCAN]:
+            if not suffix.startswith(prefix):
+                break
+            # Matches at the start of the value rank above matches inside it
+            matches[key] = matches.get(key, False) or suffix == key
+        ranked = sorted(matches, key=lambda k: (not matches[k], -self.values[k][1], len(k), k))
+        return [{'value': self.values[k][0], 'count': self.values[k][1]} for k in ranked[:limit]]
+
+
+class SuggestIndex:
+    """Prefix indexes for every suggestable field"""
+
+    def __init__(self):
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    def load(self, rows):
+        """Replace the index with (field, value, count) rows"""
+        fields = {field: _FieldIndex() for field in FIELDS}
+        for field, value, count in rows:
+            if value:
+                fields[field].add(value, count, bulk=True)
+        for index in fields.values():
+            index.entries.sort()
+        with self._lock:
+            self._fields = fields
+            self.built_at = time.monotonic()
+
+    def is_stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > REFRESH_SECONDS
+
+    def record(self, values, count=1):
+        """Add one generation's values, given as {field: value or [values]}"""
+        with self._lock:
+            for field, value in values.items():
+                for item in (value if isinstance(value, (list, tuple)) else [value]):
+                    if item:
+                        self._fields[field].add(item, count)
+
+    def suggest(self, field, query, limit=DEFAULT_LIMIT):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        with self._lock:
+            return self._fields[field].search(prefix, max(1, min(limit, MAX_LIMIT)))
+
+    def stats(self):
+        with self._lock:
+            return {field: len(index.values) for field, index in self._fields.items()}
+
+
+def index_rows(session):
+    """(field, value, count) rows for every value of a successful generation"""
+    from sqlalchemy import func
+    from models import CollegeProfile, Generation
+
+    columns = (
+        ('college', Generation.college_name),
+        ('course', Generation.course),
+        ('professor', Generation.professor_name),
+    )
+    for field, column in columns:
+        query = session.query(column, func.count()).filter(
+            column.isnot(None), Generation.status == 'success').group_by(column)
+        for value, count in query:
+            yield field, value, count
+    # Stored college profiles are suggested even before anyone has used them
+    for (name,) in session.query(CollegeProfile.name):
+        yield 'college', name, 0
+
+
+def generation_values(generation):
+    """Suggestable values of a generation record"""
+    return {
+        'college': generation.college_name,
+        'course': generation.course,
+        'professor': generation.professor_name,
+    }
+
+
+suggest_index = SuggestIndex()
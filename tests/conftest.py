@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Tests import the app's flat top-level modules from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'pptgen_test.db'))
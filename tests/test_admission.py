@@ -0,0 +1,115 @@
+import pytest
+
+import admission
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, 'ADMISSION_ENABLED', True)
+    monkeypatch.setattr(admission, 'ADMISSION_DB', str(tmp_path / 'admission.db'))
+    monkeypatch.setattr(admission, '_initialized', False)
+    monkeypatch.setattr(admission, 'time', clock)
+    monkeypatch.setattr(admission, 'RATE_BURST', 3.0)
+    monkeypatch.setattr(admission, 'RATE_PER_MINUTE', 6.0)  # one token every 10s
+    monkeypatch.setattr(admission, 'MAX_INFLIGHT_COST', 100.0)
+    monkeypatch.setattr(admission, 'HEAVY_COST', 50.0)
+    monkeypatch.setattr(admission, 'HEAVY_SLOTS', 1)
+    return clock
+
+
+def admit_and_release(client, cost=1):
+    ticket = admission.admit(client, cost)
+    admission.release(ticket)
+    return ticket
+
+
+def test_burst_then_429_with_retry_after(clock):
+    assert all(admit_and_release('a').admitted for _ in range(3))
+    ticket = admit_and_release('a')
+    assert not ticket.admitted
+    assert ticket.status == 429
+    assert ticket.retry_after == 10
+
+
+def test_bucket_refills_over_time(clock):
+    for _ in range(3):
+        admit_and_release('a')
+    clock.now += 10
+    assert admit_and_release('a').admitted
+    assert not admit_and_release('a').admitted
+
+
+def test_clients_have_separate_buckets(clock):
+    for _ in range(3):
+        admit_and_release('a')
+    assert admit_and_release('b').admitted
+
+
+def test_rejected_requests_do_not_spend_tokens(clock):
+    held = [admission.admit('a', 45), admission.admit('c', 45)]
+    assert admission.admit('b', 20).status == 503
+    for ticket in held:
+        admission.release(ticket)
+    assert [admit_and_release('b').admitted for _ in range(4)] == [True, True, True, False]
+
+
+def test_fast_lane_capacity_503(clock):
+    held = admission.admit('a', 40)
+    ticket = admission.admit('b', 45)
+    assert held.admitted and held.lane == admission.FAST_LANE
+    assert ticket.admitted
+    busy = admission.admit('c', 30)
+    assert busy.status == 503
+    assert busy.retry_after == admission.BUSY_RETRY_AFTER
+    admission.release(held)
+    assert admission.admit('c', 30).admitted
+
+
+def test_heavy_lane_is_bounded_and_separate(clock):
+    heavy = admission.admit('a', 60)
+    assert heavy.admitted and heavy.lane == admission.HEAVY_LANE
+    second = admission.admit('b', 60)
+    assert second.status == 503 and second.retry_after >= admission.BUSY_RETRY_AFTER
+    # Small decks are still admitted while the heavy slot is taken
+    assert admit_and_release('c', 5).admitted
+    admission.release(heavy)
+    assert admission.admit('b', 60).admitted
+
+
+def test_leaked_tickets_expire(clock):
+    admission.admit('a', 60)
+    clock.now += admission.TICKET_TTL + 1
+    assert admission.admit('b', 60).admitted
+
+
+def test_charge_uses_bucket_only(clock):
+    assert [admission.charge('u').admitted for _ in range(4)] == [True, True, True, False]
+    assert admission.charge('u').status == 429
+
+
+def test_client_key_ignores_forwarded_for_without_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(admission, 'TRUSTED_PROXIES', 0)
+    assert admission.client_key('6.6.6.6', '10.0.0.1') == '10.0.0.1'
+
+
+def test_client_key_uses_hop_added_by_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(admission, 'TRUSTED_PROXIES', 1)
+    assert admission.client_key('6.6.6.6, 203.0.113.7', '10.0.0.1') == '203.0.113.7'
+    monkeypatch.setattr(admission, 'TRUSTED_PROXIES', 2)
+    assert admission.client_key('6.6.6.6, 203.0.113.7, 10.0.0.2', '10.0.0.1') == '203.0.113.7'
+    assert admission.client_key('203.0.113.7', '10.0.0.1') == '10.0.0.1'
+
+
+def test_estimate_cost_grows_with_content():
+    small = {'slides': [{'blocks': [{'kind': 'paragraph', 'text': 'x'}]}]}
+    table = {'slides': [{'blocks': [{'kind': 'table', 'rows': [['a', 'b']] * 200}]}]}
+    assert admission.estimate_cost(table) > admission.estimate_cost(small) > 0
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from charts import lttb_indices, multi_series_lttb_indices, prepare_category_chart, prepare_xy_chart
+
+
+def test_lttb_keeps_endpoints_and_bound():
+    x = np.arange(10000)
+    y = np.sin(x / 50.0)
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 9999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_spike():
+    y = np.zeros(5000)
+    y[2345] = 100.0
+    assert 2345 in lttb_indices(np.arange(5000), y, 50)
+
+
+def test_multi_series_lttb_bound():
+    rng = np.random.default_rng(1)
+    ys = np.cumsum(rng.normal(size=(5, 3000)), axis=1)
+    idx = multi_series_lttb_indices(np.arange(3000), ys, 120)
+    assert len(idx) == 120
+    assert idx[0] == 0 and idx[-1] == 2999
+
+
+@pytest.mark.parametrize('chart_type', ['line', 'bar'])
+def test_point_count_bounded_by_max_points(chart_type):
+    rng = np.random.default_rng(0)
+    block = {'series': [{'values': np.cumsum(rng.normal(size=5000)).tolist()} for _ in range(20)],
+             'max_points': 150}
+    categories, series = prepare_category_chart(block, chart_type)
+    assert len(categories) <= 150
+    assert all(len(values) == len(categories) for _, values in series)
+
+
+def test_many_series_keep_their_budget():
+    rng = np.random.default_rng(0)
+    block = {'series': [{'values': np.cumsum(rng.normal(size=5000)).tolist()} for _ in range(100)],
+             'max_points': 200}
+    categories, _ = prepare_category_chart(block, 'line')
+    assert len(categories) == 200
+
+
+def test_values_beyond_categories_are_dropped():
+    block = {'categories': ['a', 'b'], 'series': [{'values': list(range(1000))}]}
+    categories, series = prepare_category_chart(block, 'line')
+    assert categories == ['a', 'b']
+    assert series[0][1] == [0.0, 1.0]
+
+
+@pytest.mark.parametrize('max_points', [0, 2])
+def test_tiny_max_points_is_clamped(max_points):
+    block = {'series': [{'values': list(range(10000))}], 'max_points': max_points}
+    categories, _ = prepare_category_chart(block, 'line')
+    assert len(categories) == 3
+    xy = prepare_xy_chart({'series': [{'x': list(range(10000)), 'y': list(range(10000))}],
+                           'max_points': max_points})
+    assert len(xy[0][1]) == 3
+
+
+def test_pie_folds_small_slices():
+    block = {'categories': list('abcdefghij'), 'series': [{'values': list(range(10, 0, -1))}], 'max_slices': 4}
+    categories, series = prepare_category_chart(block, 'pie')
+    assert categories == ['a', 'b', 'c', 'Other']
+    assert series[0][1][-1] == sum(range(1, 8))
@@ -0,0 +1,69 @@
+from pagination import BOTTOM_MARGIN, CONTINUED_SUFFIX, SLIDE_HEIGHT, TABLE_TOP, paginate_slides
+
+
+def table_slide(num_rows, **extra):
+    rows = [['Name', 'Score']] + [[f'Student {i}', str(i)] for i in range(num_rows)]
+    return {'title': 'Results', 'subtitle': 'Term 1', 'notes': 'n',
+            'blocks': [dict({'kind': 'table', 'rows': rows}, **extra)]}
+
+
+def test_small_slide_is_untouched():
+    slide = table_slide(3)
+    assert paginate_slides([slide]) == [slide]
+
+
+def test_table_rows_split_with_header_repeated():
+    pages = paginate_slides([table_slide(300)])
+    assert len(pages) > 1
+    body_rows = []
+    for page in pages:
+        (table,) = page['blocks']
+        assert table['rows'][0] == ['Name', 'Score']
+        assert table['height'] <= SLIDE_HEIGHT - BOTTOM_MARGIN - TABLE_TOP + 1e-6
+        body_rows.extend(table['rows'][1:])
+    assert body_rows == [[f'Student {i}', str(i)] for i in range(300)]
+
+
+def test_continuation_pages_are_titled_and_drop_subtitle_and_notes():
+    first, second = paginate_slides([table_slide(300)])[:2]
+    assert first['title'] == 'Results' and first['subtitle'] == 'Term 1' and first['notes'] == 'n'
+    assert second['title'] == 'Results' + CONTINUED_SUFFIX
+    assert 'subtitle' not in second and 'notes' not in second
+
+
+def test_headerless_table_does_not_repeat_first_row():
+    pages = paginate_slides([table_slide(300, header=False)])
+    rows = [row for page in pages for row in page['blocks'][0]['rows']]
+    assert rows.count(['Name', 'Score']) == 1
+
+
+def test_numbered_list_numbering_continues():
+    slide = {'title': 'Steps', 'blocks': [{'kind': 'numbered_list', 'start': 5,
+                                           'items': [f'Step {i}' for i in range(60)]}]}
+    pages = paginate_slides([slide])
+    assert len(pages) > 1
+    expected = 5
+    for page in pages:
+        (block,) = page['blocks']
+        assert block['start'] == expected
+        expected += len(block['items'])
+    assert expected == 65
+
+
+def test_bullets_split_without_losing_items():
+    items = [{'text': f'Point {i}', 'subpoints': ['a', 'b']} for i in range(40)]
+    pages = paginate_slides([{'title': 'Points', 'blocks': [{'kind': 'bullets', 'items': items}]}])
+    assert len(pages) > 1
+    assert [item for page in pages for item in page['blocks'][0]['items']] == items
+
+
+def test_smaller_body_makes_more_pages():
+    slide = {'title': 'L', 'blocks': [{'kind': 'bullets', 'items': [f'item {i}' for i in range(30)]}]}
+    assert len(paginate_slides([slide], body_height=2.0)) > len(paginate_slides([slide]))
+
+
+def test_pagination_opt_out():
+    slide = dict(table_slide(300), paginate=False)
+    assert paginate_slides([slide]) == [slide]
+    title = {'type': 'title', 'title': 'Deck'}
+    assert paginate_slides([title]) == [title]
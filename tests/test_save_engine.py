@@ -0,0 +1,87 @@
+import io
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+from renderer import build_presentation
+from save_engine import part_kind, save_presentation
+
+DECK = {
+    'meta': {'title': 'Round trip', 'subtitle': 'Save engine'},
+    'slides': [
+        {'title': 'Text', 'blocks': [{'kind': 'bullets', 'items': ['one', 'two']}], 'notes': 'Speaker notes'},
+        {'title': 'Table', 'blocks': [{'kind': 'table', 'rows': [['A', 'B'], ['1', '2']]}]},
+        {'title': 'Chart', 'blocks': [{'kind': 'chart', 'chart_type': 'line', 'categories': ['x', 'y', 'z'],
+                                       'series': [{'name': 'S', 'values': [1, 3, 2]}]}]},
+    ],
+}
+
+
+def slide_titles(prs):
+    return [slide.shapes.title.text for slide in prs.slides]
+
+
+def test_part_kinds():
+    assert part_kind('ppt/slides/slide1.xml') == 'xml'
+    assert part_kind('_rels/.rels') == 'xml'
+    assert part_kind('ppt/media/image1.PNG') == 'media'
+    assert part_kind('ppt/embeddings/Microsoft_Excel_Sheet1.xlsx') == 'binary'
+
+
+@pytest.mark.parametrize('profile', ['fast', 'small'])
+def test_save_presentation_round_trip(profile):
+    buf = io.BytesIO()
+    save_presentation(build_presentation(DECK), buf, profile)
+
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        assert '[Content_Types].xml' in names
+        assert any(name.startswith('ppt/charts/') for name in names)
+
+    reopened = Presentation(io.BytesIO(buf.getvalue()))
+    assert slide_titles(reopened) == ['Round trip', 'Text', 'Table', 'Chart']
+    assert reopened.slides[1].notes_slide.notes_text_frame.text == 'Speaker notes'
+    assert reopened.slides[3].shapes[-1].has_chart
+
+
+def test_small_profile_is_not_larger():
+    sizes = {}
+    for profile in ('fast', 'small'):
+        buf = io.BytesIO()
+        save_presentation(build_presentation(DECK), buf, profile)
+        sizes[profile] = len(buf.getvalue())
+    assert sizes['small'] <= sizes['fast']
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        save_presentation(build_presentation(DECK), io.BytesIO(), 'tiny')
+
+
+def test_streaming_writer_round_trip():
+    from save_engine import StreamingPackageWriter
+
+    deck = dict(DECK, slides=DECK['slides'] * 20)
+    buf = io.BytesIO()
+    streamed = []
+    with StreamingPackageWriter(buf, 'fast') as writer:
+        def write_slide(slide):
+            writer.write_slide(slide)
+            streamed.append(slide.part.partname)
+
+        prs = build_presentation(deck, on_slide=write_slide)
+        writer.finish(prs)
+
+    assert len(streamed) == 61
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        # Every part is written exactly once
+        assert len(names) == len(set(names))
+
+    reopened = Presentation(io.BytesIO(buf.getvalue()))
+    assert slide_titles(reopened) == ['Round trip'] + ['Text', 'Table', 'Chart'] * 20
+    assert reopened.slides[1].notes_slide.notes_text_frame.text == 'Speaker notes'
+    assert reopened.slides[-1].shapes[-1].has_chart
@@ -0,0 +1,11 @@
+import main
+
+
+def test_cold_import_within_budget():
+    best, _ = main.measure_cold_import()
+    assert best <= main.IMPORT_BUDGET_MS, f"cold import took {best:.0f}ms"
+
+
+def test_heavy_modules_not_imported_at_startup():
+    _, loaded = main.measure_cold_import(runs=1)
+    assert loaded == []
@@ -0,0 +1,55 @@
+from suggest import MAX_LIMIT, SuggestIndex
+
+
+def make_index():
+    index = SuggestIndex()
+    index.load([
+        ('college', 'Jain University', 5),
+        ('college', 'Jawaharlal College', 9),
+        ('college', 'Christ University', 2),
+        ('course', 'BCA', 3),
+    ])
+    return index
+
+
+def values(results):
+    return [r['value'] for r in results]
+
+
+def test_prefix_matches_rank_by_count():
+    assert values(make_index().suggest('college', 'ja')) == ['Jawaharlal College', 'Jain University']
+
+
+def test_value_start_ranks_above_word_match():
+    index = make_index()
+    index.load([('college', 'Universal Academy', 1), ('college', 'Jain University', 50)])
+    assert values(index.suggest('college', 'univ')) == ['Universal Academy', 'Jain University']
+
+
+def test_later_words_match_case_insensitively():
+    assert values(make_index().suggest('college', 'UNI')) == ['Jain University', 'Christ University']
+
+
+def test_fields_are_separate():
+    assert make_index().suggest('course', 'ja') == []
+
+
+def test_record_adds_and_counts():
+    index = make_index()
+    index.record({'college': 'Jain University'}, count=10)
+    index.record({'college': ['New  Horizon College', None]})
+    results = index.suggest('college', 'j')
+    assert results[0] == {'value': 'Jain University', 'count': 15}
+    assert values(index.suggest('college', 'new h')) == ['New Horizon College']
+
+
+def test_limit_is_clamped():
+    index = make_index()
+    assert values(index.suggest('college', 'j', limit=-1)) == ['Jawaharlal College']
+    assert len(index.suggest('college', 'j', limit=0)) == 1
+    index.load([('college', f'College {i}', 1) for i in range(100)])
+    assert len(index.suggest('college', 'college', limit=1000)) == MAX_LIMIT
+
+
+def test_empty_query_returns_nothing():
+    assert make_index().suggest('college', '   ') == []
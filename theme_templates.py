@@ -0,0 +1,295 @@
+import copy
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+# Uploaded .pptx theme templates, stored content-addressed by SHA-256 as
+# <id>.pptx plus an <id>.json sidecar with the precomputed layout maps
+
+TEMPLATE_DIR = os.getenv('PPT_TEMPLATE_DIR', os.path.join(tempfile.gettempdir(), 'pptgen-templates'))
+MAX_TEMPLATE_BYTES = int(os.getenv('PPT_TEMPLATE_MAX_MB', 20)) * 1024 * 1024
+TEMPLATE_CACHE_BYTES = int(os.getenv('PPT_TEMPLATE_CACHE_MB', 64)) * 1024 * 1024
+# Limits on what uploads may cost: the unpacked size of one package (checked
+# before parsing, against deflate bombs) and the size of the whole store, kept
+# by evicting the least recently used templates
+MAX_TEMPLATE_UNPACKED_BYTES = int(os.getenv('PPT_TEMPLATE_MAX_UNPACKED_MB', 100)) * 1024 * 1024
+MAX_TEMPLATES = int(os.getenv('PPT_TEMPLATE_MAX_COUNT', 200))
+MAX_TEMPLATE_STORE_BYTES = int(os.getenv('PPT_TEMPLATE_STORE_MB', 500)) * 1024 * 1024
+
+# Layout indexes of the built-in python-pptx template
+DEFAULT_ROLES = {'title': 0, 'content': 1, 'blank': 6}
+
+TEMPLATE_ID = re.compile(r'^[0-9a-f]{64}$')
+
+# Placeholders that every layout may carry without being a content area
+DECORATION_TYPES = ('dt', 'ftr', 'sldNum')
+TITLE_TYPES = ('title', 'ctrTitle')
+
+
+def template_id(data):
+    """Content address of a template file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _paths(tid):
+    if not TEMPLATE_ID.match(tid or ''):
+        raise ValueError(f"Invalid template id: {tid}")
+    base = os.path.join(TEMPLATE_DIR, tid)
+    return base + '.pptx', base + '.json'
+
+
+def _placeholder_types(layout):
+    """(type, idx) of every placeholder on a layout"""
+    ns = {'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'}
+    return [(ph.get('type', 'obj'), int(ph.get('idx', 0)))
+            for ph in layout._element.iterfind('.//p:nvPr/p:ph', ns)]
+
+
+def _theme_font(prs):
+    """Latin typeface of the theme's body (minor) font"""
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    theme = prs.slide_master.part.part_related_by(RT.THEME)
+    match = re.search(rb'<a:minorFont>\s*<a:latin typeface="([^"]*)"', theme.blob)
+    return match.group(1).decode() if match else None
+
+
+def inspect_template(prs):
+    """Layout name -> index map and the layouts used for title, content and blank slides"""
+    layouts = []
+    roles = {}
+    for index, layout in enumerate(prs.slide_layouts):
+        placeholders = _placeholder_types(layout)
+        kinds = {t for t, _ in placeholders if t not in DECORATION_TYPES}
+        layouts.append({'index': index, 'name': layout.name, 'placeholders': sorted(kinds)})
+        if 'ctrTitle' in kinds:
+            roles.setdefault('title', index)
+        if kinds & set(TITLE_TYPES):
+            roles.setdefault('titled', index)
+            if any(idx == 1 and t in ('obj', 'body') for t, idx in placeholders):
+                roles.setdefault('content', index)
+        if not kinds:
+            roles.setdefault('blank', index)
+
+    # Templates without a title or content layout fall back to any layout
+    # with a title; the renderer copes with missing title and body placeholders
+    last = len(layouts) - 1
+    titled = roles.pop('titled', 0)
+    roles.setdefault('title', titled)
+    roles.setdefault('content', titled)
+    roles.setdefault('blank', last)
+
+    # Body size the content layout paginates with (see renderer._render_slides)
+    body = prs.slide_layouts[roles['content']].placeholders.get(idx=1)
+    body_size = None
+    if body is not None and body.width is not None and body.height is not None:
+        body_size = {'width': round(body.width.inches, 3), 'height': round(body.height.inches, 3)}
+    return {
+        'layouts': layouts,
+        'layout_map': {layout['name']: layout['index'] for layout in layouts},
+        'roles': roles,
+        'slide_width': round(prs.slide_width.inches, 3),
+        'slide_height': round(prs.slide_height.inches, 3),
+        'body': body_size,
+        'font': _theme_font(prs),
+    }
+
+
+def unpacked_size(data):
+    """Total uncompressed size of the files in a .pptx package, read from the zip directory"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            return sum(info.file_size for info in zf.infolist())
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a valid .pptx template: {e}") from e
+
+
+def _stored_templates():
+    """[(last used, id, bytes)] of every stored template, least recently used first"""
+    stored = []
+    try:
+        entries = os.scandir(TEMPLATE_DIR)
+    except FileNotFoundError:
+        return stored
+    with entries:
+        for entry in entries:
+            tid, ext = os.path.splitext(entry.name)
+            if ext != '.pptx' or not TEMPLATE_ID.match(tid):
+                continue
+            try:
+                # The sidecar's mtime is bumped by mark_used on every render
+                used = os.stat(os.path.join(TEMPLATE_DIR, tid + '.json')).st_mtime
+                stored.append((used, tid, entry.stat().st_size))
+            except OSError:
+                continue
+    return sorted(stored)
+
+
+def _make_room(incoming_bytes):
+    """Delete least recently used templates until one more of `incoming_bytes` fits"""
+    stored = _stored_templates()
+    count, size = len(stored), sum(s for _, _, s in stored)
+    for _, tid, tsize in stored:
+        if count < MAX_TEMPLATES and size + incoming_bytes <= MAX_TEMPLATE_STORE_BYTES:
+            break
+        delete_template(tid)
+        count -= 1
+        size -= tsize
+        print(f"🗑️  Evicted least recently used template {tid}")
+
+
+def delete_template(tid):
+    for path in _paths(tid):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    template_cache.discard(tid)
+
+
+def mark_used(tid):
+    """Record that a template was just rendered with, for least-recently-used eviction"""
+    _, meta_path = _paths(tid)
+    try:
+        os.utime(meta_path)
+    except OSError:
+        pass
+
+
+def _parse(data):
+    from pptx import Presentation
+
+    try:
+        return Presentation(io.BytesIO(data))
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        raise ValueError(f"Not a valid .pptx template: {e}") from e
+
+
+def store_template(data, name=None):
+    """Validate and store an uploaded template; returns its metadata
+
+    Uploading the same file twice returns the existing entry.
+    """
+    if len(data) > MAX_TEMPLATE_BYTES:
+        raise ValueError(f"Template larger than {MAX_TEMPLATE_BYTES // (1024 * 1024)} MB")
+    tid = template_id(data)
+    existing = load_metadata(tid)
+    if existing:
+        mark_used(tid)
+        return existing
+
+    if unpacked_size(data) > MAX_TEMPLATE_UNPACKED_BYTES:
+        raise ValueError(f"Template unpacks to more than {MAX_TEMPLATE_UNPACKED_BYTES // (1024 * 1024)} MB")
+    meta = inspect_template(_parse(data))
+    meta.update({'id': tid, 'name': name or 'template', 'size': len(data)})
+
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
+    _make_room(len(data))
+    pptx_path, meta_path = _paths(tid)
+    for path, payload in ((pptx_path, data), (meta_path, json.dumps(meta, indent=2).encode())):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    return meta
+
+
+def load_metadata(tid):
+    """Stored metadata for a template id, or None if unknown"""
+    _, meta_path = _paths(tid)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _remove_slides(prs):
+    """Drop sample slides shipped inside the template file"""
+    # Works on the XML directly: `prs.slides` would cache a proxy holding a
+    # sub-element, which deep copies of the presentation would not share
+    sldIdLst = prs.part._element.sldIdLst
+    if sldIdLst is None:
+        return
+    for sldId in list(sldIdLst.sldId_lst):
+        sldIdLst.remove(sldId)
+        prs.part.drop_rel(sldId.rId)
+
+
+class TemplateCache:
+    """Parsed template packages kept in memory, least recently used evicted by size
+
+    Entries are pristine presentations that are never rendered into; each
+    request gets a deep copy, which is cheaper than unzipping and parsing
+    the package again.
+    """
+
+    def __init__(self, max_bytes=TEMPLATE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, tid):
+        pptx_path, _ = _paths(tid)
+        meta = load_metadata(tid)
+        if meta is None or not os.path.exists(pptx_path):
+            raise KeyError(tid)
+        with open(pptx_path, 'rb') as f:
+            data = f.read()
+        size = unpacked_size(data)
+        prs = _parse(data)
+        _remove_slides(prs)
+        return prs, meta, size
+
+    def get(self, tid):
+        """(pristine presentation, metadata) for a stored template"""
+        with self._lock:
+            entry = self._entries.get(tid)
+            if entry:
+                self._entries.move_to_end(tid)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+
+        prs, meta, size = self._load(tid)
+        with self._lock:
+            if tid not in self._entries and size <= self.max_bytes:
+                self._entries[tid] = (prs, meta, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+        return prs, meta
+
+    def discard(self, tid):
+        with self._lock:
+            entry = self._entries.pop(tid, None)
+            if entry:
+                self.bytes -= entry[2]
+
+    def stats(self):
+        with self._lock:
+            return {'templates': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+template_cache = TemplateCache()
+
+
+def open_template(tid):
+    """Fresh presentation built on a stored template, plus its metadata
+
+    Raises KeyError for unknown templates.
+    """
+    pristine, meta = template_cache.get(tid)
+    mark_used(tid)
+    return copy.deepcopy(pristine), meta
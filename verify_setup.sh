@@ -100,6 +100,16 @@ else
     ERRORS=$((ERRORS+1))
 fi
 
+# Cold start budget (heavy rendering modules must stay lazily imported)
+echo -n "Checking startup time... "
+if STARTUP=$(flask --app main check-startup 2>&1); then
+    echo "✅ $(echo "$STARTUP" | head -1)"
+else
+    echo "❌ Startup check failed"
+    echo "$STARTUP"
+    ERRORS=$((ERRORS+1))
+fi
+
 # Summary
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"